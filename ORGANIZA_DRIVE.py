@@ -41,20 +41,40 @@ CATEGORIAS = {
 # IDEOGRAPHIC FULL STOP para diferenciar final dos nomes Biancogres
 FULL_STOP = '。'
 
-if len(sys.argv) > 1:
-    RAIZ = sys.argv[1]
-else:
-    RAIZ = os.path.dirname(os.path.abspath(__file__))
 
-# Definir raízes de saída
-ROOT_BIANCOGRES = os.path.join(RAIZ, 'BIANCOGRES')
-ROOT_VILLAGRES = os.path.join(RAIZ, 'VILLAGRES')
+def criar_estrutura(raiz):
+    """Cria BIANCOGRES/ e VILLAGRES/ com as pastas de categoria dentro de raiz."""
+    for root in (os.path.join(raiz, 'BIANCOGRES'), os.path.join(raiz, 'VILLAGRES')):
+        os.makedirs(root, exist_ok=True)
+        for cat in CATEGORIAS:
+            os.makedirs(os.path.join(root, cat), exist_ok=True)
+
+
+def detectar_categoria(nome):
+    """Retorna a categoria do nome de pasta (sem o FULL_STOP) ou None."""
+    nome_norm = normalizar(nome)
+    for cat, palavras in CATEGORIAS.items():
+        for p in palavras:
+            if p in nome_norm:
+                return cat
+    return None
+
+
+def destino_organizado(raiz, nome):
+    """
+    Calcula o caminho final RAIZ/<SITE>/<CATEGORIA>/<FORMATO>/<nome> de uma pasta
+    de produto, com as mesmas regras usadas por organizar_itens.
+    Retorna None se o nome não se encaixa em nenhuma categoria.
+    """
+    # Determinar destino pela presença do ideographic full stop
+    site = 'BIANCOGRES' if nome.endswith(FULL_STOP) else 'VILLAGRES'
+    nome_limpo = nome.rstrip(FULL_STOP)
+
+    categoria = detectar_categoria(nome_limpo)
+    if not categoria:
+        return None
+    return os.path.join(raiz, site, categoria, extrair_formato(nome_limpo), nome)
 
-# Criar estrutura de pastas
-for root in (ROOT_BIANCOGRES, ROOT_VILLAGRES):
-    os.makedirs(root, exist_ok=True)
-    for cat in CATEGORIAS:
-        os.makedirs(os.path.join(root, cat), exist_ok=True)
 
 def organizar_itens(raiz):
     print(f"Organizando itens em: {raiz}\n")
@@ -76,38 +96,15 @@ def organizar_itens(raiz):
             
         total_pastas += 1
 
-        # Determinar destino pela presença do ideographic full stop
-        if nome.endswith(FULL_STOP):
-            destino_root = ROOT_BIANCOGRES
-        else:
-            destino_root = ROOT_VILLAGRES
-
-        # Normalizar para detecção de categoria (remover o FULL_STOP antes)
-        nome_limpo = nome.rstrip(FULL_STOP)
-        nome_norm = normalizar(nome_limpo)
-
-        # Detectar categoria
-        categoria_detectada = None
-        for cat, palavras in CATEGORIAS.items():
-            for p in palavras:
-                if p in nome_norm:
-                    categoria_detectada = cat
-                    break
-            if categoria_detectada:
-                break
-
-        if not categoria_detectada:
+        destino = destino_organizado(raiz, nome)
+        if not destino:
             print(f"[ ] Sem categoria: '{nome}'")
             pastas_sem_categoria += 1
             continue
 
-        # Extrair formato do nome da pasta
-        formato = extrair_formato(nome_limpo)
-        formatos_encontrados.add(formato)
-        
-        # Montar caminho de destino com o formato incluído
-        destino = os.path.join(destino_root, categoria_detectada, formato, nome)
-        
+        # Formato é o penúltimo nível do destino
+        formatos_encontrados.add(os.path.basename(os.path.dirname(destino)))
+
         # Criar pasta de formato se não existir
         os.makedirs(os.path.dirname(destino), exist_ok=True)
         
@@ -135,4 +132,11 @@ def organizar_itens(raiz):
     print("\nOrganização concluída com sucesso!")
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        RAIZ = sys.argv[1]
+    else:
+        RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+    # Criar estrutura de pastas
+    criar_estrutura(RAIZ)
     organizar_itens(RAIZ)
\ No newline at end of file
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark e corpus de regressão dos extratores:
+- corpus/paginas/<site>/*.html: páginas de produto salvas
+- corpus/esperado.json: a URL de cada página e o que extrair_produto deve devolver, os textos
+  de formato com a saída esperada de cada extrair_formato (Bot_vilagress, biancogress e
+  ORGANIZA_DRIVE) e nomes de pasta com o destino esperado do destino_organizado
+
+Para cada página mostra o tempo do parse (BeautifulSoup), o tempo de extrair_produto e de
+extrair_especificacoes_villagres, o pico de memória (tracemalloc) e se a saída bate com a esperada.
+Sai com código 1 se alguma saída mudou, para conferir uma otimização antes de rodar os bots.
+
+python benchmark_extratores.py
+python benchmark_extratores.py --repeticoes 50
+python benchmark_extratores.py --gravacoes D:/paginas   # também as páginas do --gravar
+python benchmark_extratores.py --atualizar              # aceita as saídas atuais como esperadas
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import Bot_vilagress
+import biancogress
+import ORGANIZA_DRIVE
+import paginas_gravadas
+
+PASTA_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+ESPERADO = os.path.join(PASTA_CORPUS, 'esperado.json')
+
+EXTRATORES = {'villagres': Bot_vilagress, 'biancogres': biancogress}
+
+# As três versões de extrair_formato, com o nome usado em esperado.json
+FORMATOS = {
+    'Bot_vilagress': Bot_vilagress.extrair_formato,
+    'biancogress': biancogress.extrair_formato,
+    'ORGANIZA_DRIVE': ORGANIZA_DRIVE.extrair_formato,
+}
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    """Mediana, em milissegundos, de `repeticoes` chamadas de funcao(). A saída padrão é descartada."""
+    tempos = []
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+        for _ in range(repeticoes):
+            start = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - start)
+    return statistics.median(tempos) * 1000
+
+
+def pico_memoria(funcao) -> tuple:
+    """(resultado, pico de memória em KB) de uma chamada de funcao()."""
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+        tracemalloc.start()
+        try:
+            resultado = funcao()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return resultado, pico / 1024
+
+
+def diferencas(obtido: dict, esperado: dict) -> list:
+    """Campos de extrair_produto que mudaram."""
+    return [campo for campo in esperado if obtido.get(campo) != esperado[campo]]
+
+
+def site_da_url(url: str) -> str:
+    return 'biancogres' if 'biancogres' in url else 'villagres'
+
+
+def medir_pagina(nome: str, site: str, url: str, html: str, esperado: dict, repeticoes: int) -> dict:
+    bot = EXTRATORES[site]
+    linha = {
+        'pagina': nome,
+        'kb': len(html.encode('utf-8')) / 1024,
+        'parse': cronometrar(lambda: BeautifulSoup(html, 'html.parser'), repeticoes),
+        'extrair': cronometrar(lambda: bot.extrair_produto(html, url), repeticoes),
+        'especificacoes': None,
+    }
+    if site == 'villagres':
+        soup = BeautifulSoup(html, 'html.parser')
+        linha['especificacoes'] = cronometrar(lambda: Bot_vilagress.extrair_especificacoes_villagres(soup),
+                                              repeticoes)
+    produto, linha['memoria'] = pico_memoria(lambda: bot.extrair_produto(html, url))
+    linha['produto'] = produto
+    linha['diferencas'] = diferencas(produto, esperado) if esperado is not None else None
+    return linha
+
+
+def paginas_do_corpus(esperado: dict):
+    """Gera (nome, site, url, html, esperado) de cada página do corpus."""
+    for nome, dados in esperado['paginas'].items():
+        with open(os.path.join(PASTA_CORPUS, 'paginas', nome), 'r', encoding='utf-8') as f:
+            html = f.read()
+        yield nome, nome.split('/')[0], dados['url'], html, dados.get('produto')
+
+
+def paginas_gravadas_em(pasta: str):
+    """Mesmo formato de paginas_do_corpus, a partir das gravações do --gravar."""
+    for caminho in paginas_gravadas.listar_gravacoes(pasta):
+        dados = paginas_gravadas.ler_gravacao(caminho)
+        # A gravação guarda só os campos que o bot extraiu naquele dia
+        yield (os.path.basename(caminho), site_da_url(dados['url']), dados['url'], dados['html'],
+               dados['produto'])
+
+
+def mostrar_paginas(linhas) -> int:
+    """Imprime a tabela das páginas e retorna quantas saídas mudaram."""
+    print(f"{'página':<45} {'KB':>6} {'parse':>8} {'extrair':>8} {'specs':>7} {'mem KB':>8}  saída")
+    erros = 0
+    for linha in linhas:
+        specs = f"{linha['especificacoes']:.2f}" if linha['especificacoes'] is not None else '-'
+        if linha['diferencas'] is None:
+            situacao = 'sem esperado'
+        elif linha['diferencas']:
+            situacao = '✘ mudou: ' + ', '.join(linha['diferencas'])
+            erros += 1
+        else:
+            situacao = '✔'
+        print(f"{linha['pagina'][:45]:<45} {linha['kb']:>6.1f} {linha['parse']:>8.2f} {linha['extrair']:>8.2f} "
+              f"{specs:>7} {linha['memoria']:>8.0f}  {situacao}")
+        if linha['diferencas']:
+            print(f"    nome_base: {linha['produto']['nome_base']}")
+    return erros
+
+
+def medir_formatos(textos: list, repeticoes: int) -> int:
+    """Tempo médio por chamada e acertos de cada extrair_formato. Retorna quantas saídas mudaram."""
+    print(f"\n{'extrair_formato':<16} {'µs/chamada':>11} {'acertos':>9}")
+    erros = 0
+    for nome, funcao in FORMATOS.items():
+        casos = [(t['texto'], t[nome]) for t in textos if nome in t]
+        ms = cronometrar(lambda: [funcao(texto) for texto, _ in casos], repeticoes)
+        errados = [(texto, funcao(texto), esperado) for texto, esperado in casos if funcao(texto) != esperado]
+        print(f"{nome:<16} {ms * 1000 / max(1, len(casos)):>11.2f} {len(casos) - len(errados):>4}/{len(casos):<4}")
+        for texto, obtido, esperado in errados:
+            print(f"    ✘ {texto!r}: {obtido!r} (esperado {esperado!r})")
+        erros += len(errados)
+    return erros
+
+
+def destino(nome: str):
+    """destino_organizado relativo e sempre com '/', para o esperado valer também no Windows."""
+    caminho = ORGANIZA_DRIVE.destino_organizado('', nome)
+    return caminho.replace(os.sep, '/') if caminho else caminho
+
+
+def medir_pastas(pastas: list, repeticoes: int) -> int:
+    """Confere destino_organizado para os nomes de pasta. Retorna quantas saídas mudaram."""
+    ms = cronometrar(lambda: [destino(p['nome']) for p in pastas], repeticoes)
+    errados = [p for p in pastas if destino(p['nome']) != p['destino']]
+    print(f"\n{'destino_organizado':<18} {ms * 1000 / max(1, len(pastas)):>9.2f} µs/chamada "
+          f"{len(pastas) - len(errados):>4}/{len(pastas)} acertos")
+    for p in errados:
+        print(f"    ✘ {p['nome']!r}: {destino(p['nome'])!r} "
+              f"(esperado {p['destino']!r})")
+    return len(errados)
+
+
+def atualizar(esperado: dict) -> None:
+    """Regrava esperado.json com as saídas atuais dos extratores."""
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+        for nome, site, url, html, _ in paginas_do_corpus(esperado):
+            esperado['paginas'][nome]['produto'] = EXTRATORES[site].extrair_produto(html, url)
+        for t in esperado['formatos']:
+            for nome, funcao in FORMATOS.items():
+                t[nome] = funcao(t['texto'])
+        for p in esperado['pastas']:
+            p['destino'] = destino(p['nome'])
+    with open(ESPERADO, 'w', encoding='utf-8') as f:
+        json.dump(esperado, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"[✔] {ESPERADO} atualizado com as saídas atuais")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Tempo, memória e regressão dos extratores')
+    parser.add_argument('--repeticoes', metavar='N', type=int, default=20,
+                        help='repetições de cada medição; vale a mediana (padrão: 20)')
+    parser.add_argument('--gravacoes', metavar='PASTA', default=None,
+                        help='inclui as páginas gravadas com --gravar (esperado: o que foi extraído na gravação)')
+    parser.add_argument('--atualizar', action='store_true',
+                        help='aceita as saídas atuais como esperadas e regrava corpus/esperado.json')
+    args = parser.parse_args(argv)
+
+    with open(ESPERADO, 'r', encoding='utf-8') as f:
+        esperado = json.load(f)
+
+    if args.atualizar:
+        atualizar(esperado)
+        return 0
+
+    print(f"[ℹ] Mediana de {args.repeticoes} repetições, tempos em ms\n")
+    paginas = list(paginas_do_corpus(esperado))
+    if args.gravacoes:
+        paginas += list(paginas_gravadas_em(args.gravacoes))
+    linhas = [medir_pagina(*p, repeticoes=args.repeticoes) for p in paginas]
+    erros = mostrar_paginas(linhas)
+
+    total_extrair = sum(linha['extrair'] for linha in linhas)
+    total_parse = sum(linha['parse'] for linha in linhas)
+    if linhas:
+        print(f"\n[⏱] extrair_produto: {total_extrair / len(linhas):.2f} ms por página, "
+              f"{100 * total_parse / total_extrair:.0f}% no parse")
+
+    erros += medir_formatos(esperado['formatos'], args.repeticoes)
+    erros += medir_pastas(esperado['pastas'], args.repeticoes)
+
+    if erros:
+        print(f"\n[✘] {erros} saídas diferentes do esperado")
+        return 1
+    print("\n[✔] Todas as saídas batem com o esperado")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,28 @@
 import asyncio
-from playwright.async_api import async_playwright
+import re
+import sys
+
+BASE_URL = 'https://www.biancogres.com.br/pt_BR/produtos'
+OUTPUT_FILE = 'biancogres_links.txt'
+# Regex para detectar produtos: https://www.biancogres.com.br/produto/<nome>
+PRODUCT_REGEX = re.compile(r'^https://www\.biancogres\.com\.br/produto/[^/]+$')
+
+
+def descobrir_por_sitemap():
+    """Tenta os sitemaps do site (sem navegador). Retorna a lista de links ou []."""
+    from descoberta_sitemap import descobrir
+    try:
+        return descobrir('https://www.biancogres.com.br', PRODUCT_REGEX)
+    except Exception as e:
+        print(f'[INFO] Sitemap indisponível: {e}')
+        return []
+
 
 async def main():
-    base_url = 'https://www.biancogres.com.br/pt_BR/produtos'
-    output_file = 'biancogres_links.txt'
+    from playwright.async_api import async_playwright
+
+    base_url = BASE_URL
+    output_file = OUTPUT_FILE
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
@@ -42,6 +61,17 @@ async def main():
         await browser.close()
 
 if __name__ == '__main__':
+    # Primeiro tenta o sitemap; --navegador força o crawl pelo Chromium
+    if '--navegador' not in sys.argv:
+        links = descobrir_por_sitemap()
+        if links:
+            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+                for url in links:
+                    f.write(url + '\n')
+            print(f'[RESULT] {len(links)} links salvos em {OUTPUT_FILE} (sitemap)')
+            sys.exit(0)
+        print('[INFO] Sitemap sem produtos, usando o navegador')
+
     # Pré-requisitos:
     # pip install playwright
     # playwright install
@@ -7,10 +7,13 @@ Bot para coletar todos os links de produtos Villagres:
 - Navega pelas coleções e subcoleções
 - Coleta links finais de produtos
 - Salva todos em um arquivo txt
+
+Antes do navegador tenta os sitemaps do site (descoberta_sitemap.py);
+--navegador força o crawl pelo Chromium.
 """
 import asyncio
 import re
-from playwright.async_api import async_playwright
+import sys
 
 BASE_URL = 'https://villagres.com.br/PT/produtos'
 OUTPUT_FILE = 'product_links.txt'
@@ -21,7 +24,19 @@ SUBCOL_REGEX = re.compile(r'^https://villagres\.com\.br/PT/produtos/[^/]+/[^/]+$
 # Regex para detectar produtos: https://.../produtos/<colecao>/<sub>/<codigo>
 PRODUCT_REGEX = re.compile(r'^https://villagres\.com\.br/PT/produtos/[^/]+/[^/]+/[0-9A-Za-z]+$')
 
+def descobrir_por_sitemap():
+    """Tenta os sitemaps do site (sem navegador). Retorna a lista de links ou []."""
+    from descoberta_sitemap import descobrir
+    try:
+        return descobrir(BASE_URL, PRODUCT_REGEX)
+    except Exception as e:
+        print(f"[INFO] Sitemap indisponível: {e}")
+        return []
+
+
 async def main():
+    from playwright.async_api import async_playwright
+
     all_links = set()
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
@@ -92,6 +107,16 @@ async def main():
         await browser.close()
 
 if __name__ == '__main__':
+    if '--navegador' not in sys.argv:
+        links = descobrir_por_sitemap()
+        if links:
+            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+                for link in links:
+                    f.write(link + '\n')
+            print(f"[RESULT] Total de {len(links)} links de produto salvos em '{OUTPUT_FILE}' (sitemap)")
+            sys.exit(0)
+        print("[INFO] Sitemap sem produtos, usando o navegador")
+
     # Antes de rodar:
     # pip install playwright
     # playwright install
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Descoberta de links de produto por sitemap, sem navegador:
+- Lê o robots.txt do site e pega as linhas "Sitemap:"
+- Se não houver, tenta os endereços de sitemap mais comuns
+- Baixa os sitemaps em paralelo (índices de sitemap são seguidos; .xml.gz é descompactado)
+- Também aceita feeds RSS/Atom como listagem
+- Filtra os endereços com o mesmo padrão de produto dos bots de links
+
+Usado por botgorganizadolinkvila.py e botbiancolink.py antes de abrir o Chromium;
+o crawl pelo navegador fica só como alternativa quando não há sitemap útil.
+
+Sozinho:
+python descoberta_sitemap.py villagres
+python descoberta_sitemap.py biancogres saida.txt
+"""
+import gzip
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+
+# Endereços tentados quando o robots.txt não anuncia sitemap
+SITEMAPS_COMUNS = ['/sitemap.xml', '/sitemap_index.xml', '/sitemap-index.xml', '/sitemap.xml.gz']
+
+# Evita seguir índices infinitamente
+MAX_SITEMAPS = 500
+TRABALHADORES = 8
+
+HEADERS = {'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'gzip, deflate'}
+
+
+def sitemaps_do_robots(base: str, sess) -> list:
+    """Sitemaps anunciados no robots.txt do site."""
+    try:
+        resp = sess.get(urljoin(base, '/robots.txt'), headers=HEADERS, timeout=15)
+        if not resp.ok:
+            return []
+    except requests.RequestException as e:
+        print(f"[⚠] Aviso: robots.txt indisponível em {base}: {e}")
+        return []
+    sitemaps = []
+    for linha in resp.text.splitlines():
+        chave, _, valor = linha.partition(':')
+        if chave.strip().lower() == 'sitemap' and valor.strip():
+            sitemaps.append(urljoin(base, valor.strip()))
+    return sitemaps
+
+
+def baixar_listagem(url: str, sess) -> bytes:
+    """Conteúdo do sitemap/feed, já descompactado. Retorna b'' se falhar."""
+    try:
+        resp = sess.get(url, headers=HEADERS, timeout=30)
+        if not resp.ok:
+            return b''
+        conteudo = resp.content
+    except requests.RequestException as e:
+        print(f"[⚠] Aviso: falha ao baixar {url}: {e}")
+        return b''
+    # .xml.gz servido como arquivo (não como Content-Encoding)
+    if conteudo[:2] == b'\x1f\x8b':
+        try:
+            conteudo = gzip.decompress(conteudo)
+        except OSError:
+            return b''
+    return conteudo
+
+
+def ler_listagem(conteudo: bytes) -> tuple:
+    """
+    Interpreta um sitemap, índice de sitemaps ou feed RSS/Atom.
+    Retorna (sitemaps_filhos, paginas).
+    """
+    try:
+        raiz = ET.fromstring(conteudo)
+    except ET.ParseError:
+        return [], []
+
+    def nome(el):
+        return el.tag.rsplit('}', 1)[-1].lower()
+
+    filhos, paginas = [], []
+    if nome(raiz) == 'sitemapindex':
+        filhos = [el.text.strip() for el in raiz.iter() if nome(el) == 'loc' and el.text]
+    elif nome(raiz) == 'urlset':
+        paginas = [el.text.strip() for el in raiz.iter() if nome(el) == 'loc' and el.text]
+    else:
+        # RSS (<link>texto</link>) e Atom (<link href="..."/>)
+        for el in raiz.iter():
+            if nome(el) != 'link':
+                continue
+            href = el.get('href') or (el.text or '').strip()
+            if href:
+                paginas.append(href)
+    return filhos, paginas
+
+
+def descobrir(base: str, padrao) -> list:
+    """
+    Percorre os sitemaps do site e retorna os links que casam com padrao (regex compilada),
+    sem barra final, ordenados e sem repetição. Lista vazia se não houver sitemap útil.
+    """
+    sess = requests.Session()
+    pendentes = sitemaps_do_robots(base, sess)
+    if pendentes:
+        print(f"[INFO] {len(pendentes)} sitemaps no robots.txt de {base}")
+    else:
+        pendentes = [urljoin(base, s) for s in SITEMAPS_COMUNS]
+
+    vistos, links = set(), set()
+    with ThreadPoolExecutor(max_workers=TRABALHADORES) as pool:
+        while pendentes and len(vistos) < MAX_SITEMAPS:
+            lote = [u for u in dict.fromkeys(pendentes) if u not in vistos][:MAX_SITEMAPS - len(vistos)]
+            vistos.update(lote)
+            pendentes = []
+            for url, conteudo in zip(lote, pool.map(lambda u: baixar_listagem(u, sess), lote)):
+                filhos, paginas = ler_listagem(conteudo)
+                pendentes += [urljoin(url, f) for f in filhos]
+                encontrados = {p.rstrip('/') for p in paginas if padrao.match(p.rstrip('/'))}
+                if paginas:
+                    print(f"[INFO] {url}: {len(paginas)} endereços, {len(encontrados)} produtos")
+                links.update(encontrados)
+    return sorted(links)
+
+
+def salvar(links, arquivo: str) -> None:
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        for link in links:
+            f.write(link + '\n')
+
+
+def sites() -> dict:
+    """Sites conhecidos: nome -> (base, padrão de produto, arquivo de saída)."""
+    import botbiancolink
+    import botgorganizadolinkvila
+    return {
+        'villagres': ('https://villagres.com.br/PT/produtos', botgorganizadolinkvila.PRODUCT_REGEX,
+                      botgorganizadolinkvila.OUTPUT_FILE),
+        'biancogres': ('https://www.biancogres.com.br', botbiancolink.PRODUCT_REGEX,
+                       botbiancolink.OUTPUT_FILE),
+    }
+
+
+if __name__ == '__main__':
+    conhecidos = sites()
+    if len(sys.argv) < 2 or sys.argv[1] not in conhecidos:
+        print(f"Uso: python descoberta_sitemap.py {{{'|'.join(conhecidos)}}} [arquivo_saida]")
+        sys.exit(1)
+    base, padrao, saida = conhecidos[sys.argv[1]]
+    if len(sys.argv) > 2:
+        saida = sys.argv[2]
+    links = descobrir(base, padrao)
+    if not links:
+        print("[RESULT] Nenhum produto encontrado por sitemap.")
+        sys.exit(1)
+    salvar(links, saida)
+    print(f"[RESULT] {len(links)} links de produto salvos em '{saida}'")
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada de download compartilhada pelos bots de produto.
+A validação é feita enquanto os bytes chegam, sem reler o arquivo do disco:
+- Content-Length confere com o total recebido
+- Assinatura (magic bytes) confere com a extensão esperada
+- Hash opcional calculado durante a gravação
+
+Também controla o uso do link:
+- Orçamento global de banda (com faixas por horário) e limite por host
+- Arquivos de um produto baixados do menor para o maior (Content-Length)
+- Arquivos grandes numa pista própria com poucas vagas, para não sufocar os pequenos
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# requests é importado só quando um download acontece, para a partida ser rápida
+import falhas
+import pos_processamento
+
+# Configuração global da camada de download (ajustada por execucao.py)
+CONFIG = {
+    'hash': None,          # ex.: 'sha256'; None desativa
+    'tentativas': 3,
+    'espera_base': 1.0,    # espera antes da 2ª tentativa; dobra a cada nova tentativa
+    'espera_max': 60.0,    # teto da espera (Retry-After do servidor pode passar disso)
+    'paralelos': 1,        # downloads simultâneos por produto
+    'limite_grande': 50 * 1024 * 1024,  # acima disso o arquivo vai para a pista de grandes
+    'pausa': 1,            # segundos entre downloads de um mesmo produto
+}
+
+# Assinaturas conhecidas de cada tipo de arquivo
+ASSINATURAS = {
+    'jpeg': [b'\xff\xd8\xff'],
+    'png': [b'\x89PNG\r\n\x1a\n'],
+    'gif': [b'GIF87a', b'GIF89a'],
+    'webp': [b'RIFF'],  # "WEBP" nos bytes 8-12, conferido em identificar_tipo
+    'pdf': [b'%PDF-'],
+    'rar': [b'Rar!\x1a\x07'],
+    'zip': [b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08'],
+    '7z': [b"7z\xbc\xaf'\x1c"],
+}
+
+# Tipos aceitos para cada extensão. Tipos do mesmo grupo são aceitos com aviso
+# (ex.: PNG servido como .jpg, ZIP servido como .rar); fora do grupo o arquivo é recusado.
+GRUPOS = {
+    'imagem': {'jpeg', 'png', 'gif', 'webp'},
+    'pacote': {'rar', 'zip', '7z'},
+    'pdf': {'pdf'},
+}
+EXTENSOES = {
+    '.jpg': ('imagem', 'jpeg'),
+    '.jpeg': ('imagem', 'jpeg'),
+    '.png': ('imagem', 'png'),
+    '.pdf': ('pdf', 'pdf'),
+    '.rar': ('pacote', 'rar'),
+    '.zip': ('pacote', 'zip'),
+}
+
+# Bytes necessários para identificar o tipo
+TAMANHO_CABECALHO = 16
+
+
+class ArquivoInvalido(Exception):
+    """Conteúdo recebido não confere com o esperado (tamanho ou tipo)."""
+
+
+# Status HTTP que valem nova tentativa; os demais 4xx são permanentes
+STATUS_TRANSITORIOS = {408, 425, 429, 500, 502, 503, 504}
+
+# Teto para Retry-After, para um servidor não prender o bot por horas
+RETRY_AFTER_MAX = 300
+
+
+def classificar_erro(erro: Exception) -> str:
+    """Retorna 'transitorio' (vale tentar de novo) ou 'permanente'."""
+    import requests
+
+    if isinstance(erro, requests.HTTPError) and erro.response is not None:
+        status = erro.response.status_code
+        return 'transitorio' if status in STATUS_TRANSITORIOS or status >= 500 else 'permanente'
+    if isinstance(erro, (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                         requests.exceptions.InvalidSchema, PermissionError)):
+        return 'permanente'
+    # Conexão, timeout, transferência interrompida, conteúdo inválido...
+    return 'transitorio'
+
+
+def ler_retry_after(erro: Exception):
+    """Segundos pedidos pelo servidor no cabeçalho Retry-After, ou None."""
+    resp = getattr(erro, 'response', None)
+    valor = resp.headers.get('Retry-After') if resp is not None else None
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        quando = parsedate_to_datetime(valor)
+        return max(0.0, (quando - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def calcular_espera(tentativa: int, erro: Exception = None) -> float:
+    """Backoff exponencial com jitter total; Retry-After do servidor tem prioridade."""
+    retry_after = ler_retry_after(erro) if erro is not None else None
+    if retry_after is not None:
+        return min(retry_after, RETRY_AFTER_MAX)
+    teto = min(CONFIG['espera_max'], CONFIG['espera_base'] * 2 ** (tentativa - 1))
+    return random.uniform(0, teto)
+
+
+def ler_taxa(texto: str) -> int:
+    """Converte '500K', '2M', '1.5M' ou '1048576' em bytes por segundo."""
+    m = re.fullmatch(r'\s*(\d+(?:[.,]\d+)?)\s*([KMG]?)B?(?:/S)?\s*', texto.upper())
+    if not m:
+        raise ValueError(f"taxa inválida: {texto!r} (use por exemplo 500K, 2M)")
+    numero = float(m.group(1).replace(',', '.'))
+    return int(numero * {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[m.group(2)])
+
+
+def ler_janela(texto: str) -> tuple:
+    """Converte '08:00-18:00=2M' em (inicio, fim, taxa)."""
+    try:
+        horario, taxa = texto.split('=')
+        inicio, fim = (datetime.strptime(h.strip(), '%H:%M').time() for h in horario.split('-'))
+    except ValueError:
+        raise ValueError(f"janela inválida: {texto!r} (use por exemplo 08:00-18:00=2M)")
+    return inicio, fim, ler_taxa(taxa)
+
+
+class LimitadorBanda:
+    """
+    Balde de fichas compartilhado entre threads. Quem passa do orçamento dorme o tempo
+    necessário para a média voltar à taxa. Janelas (inicio, fim, taxa) trocam a taxa
+    conforme o horário; fora delas vale a taxa padrão (None = sem limite).
+    """
+
+    def __init__(self, taxa: int = None, janelas=None):
+        self.taxa = taxa
+        self.janelas = list(janelas or [])
+        self._lock = threading.Lock()
+        self._saldo = 0.0
+        self._ultimo = time.monotonic()
+
+    def taxa_atual(self):
+        agora = datetime.now().time()
+        for inicio, fim, taxa in self.janelas:
+            # Janelas como 22:00-06:00 atravessam a meia-noite
+            if (inicio <= agora < fim) if inicio <= fim else (agora >= inicio or agora < fim):
+                return taxa
+        return self.taxa
+
+    def consumir(self, n: int) -> None:
+        taxa = self.taxa_atual()
+        if not taxa:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            # Acumula no máximo 1 segundo de fichas (rajada curta)
+            self._saldo = min(taxa, self._saldo + (agora - self._ultimo) * taxa)
+            self._ultimo = agora
+            self._saldo -= n
+            espera = -self._saldo / taxa if self._saldo < 0 else 0
+        if espera:
+            time.sleep(espera)
+
+
+# Limitadores em uso (ajustados por configurar_banda)
+_banda_global = LimitadorBanda()
+_banda_hosts = {}
+_taxas_host = {}           # host -> taxa; '*' vale para hosts sem taxa própria
+_hosts_lock = threading.Lock()
+_pista_grandes = threading.BoundedSemaphore(1)
+
+
+def configurar_banda(taxa: int = None, janelas=None, taxas_host: dict = None, grandes: int = 1) -> None:
+    """Define o orçamento global, os limites por host e as vagas da pista de arquivos grandes."""
+    global _banda_global, _pista_grandes
+    _banda_global = LimitadorBanda(taxa, janelas)
+    _taxas_host.clear()
+    _taxas_host.update(taxas_host or {})
+    _banda_hosts.clear()
+    _pista_grandes = threading.BoundedSemaphore(grandes)
+
+
+def limitar(host: str, n: int) -> None:
+    """Desconta n bytes do orçamento do host e do global (bloqueia se preciso)."""
+    taxa = _taxas_host.get(host, _taxas_host.get('*'))
+    if taxa:
+        with _hosts_lock:
+            limitador = _banda_hosts.get(host)
+            if limitador is None:
+                limitador = _banda_hosts[host] = LimitadorBanda(taxa)
+        limitador.consumir(n)
+    _banda_global.consumir(n)
+
+
+def identificar_tipo(inicio: bytes) -> str:
+    """Retorna o tipo do arquivo pelos primeiros bytes, ou '' se desconhecido."""
+    for tipo, assinaturas in ASSINATURAS.items():
+        if any(inicio.startswith(a) for a in assinaturas):
+            if tipo == 'webp' and inicio[8:12] != b'WEBP':
+                continue
+            return tipo
+    return ''
+
+
+def verificar_assinatura(inicio: bytes, ext: str) -> str:
+    """
+    Confere os primeiros bytes com a extensão esperada.
+    Levanta ArquivoInvalido se o conteúdo não pertence ao grupo da extensão
+    (caso típico: página HTML de erro salva como .rar ou .jpg).
+    Retorna o tipo identificado.
+    """
+    tipo = identificar_tipo(inicio)
+    if ext not in EXTENSOES:
+        return tipo
+    grupo, esperado = EXTENSOES[ext]
+    if tipo not in GRUPOS[grupo]:
+        amostra = inicio[:TAMANHO_CABECALHO].decode('latin-1', 'replace')
+        raise ArquivoInvalido(f"conteúdo não é {esperado.upper()} (início: {amostra!r})")
+    if tipo != esperado:
+        print(f"[⚠] Aviso: esperado {esperado.upper()}, recebido {tipo.upper()}")
+    return tipo
+
+
+def gravar_validando(resp, caminho: str, ext: str, algoritmo: str = None, host: str = '') -> dict:
+    """
+    Grava a resposta em caminho + '.part' validando durante o streaming e só
+    renomeia para o nome final se tudo conferir.
+    """
+    parcial = caminho + '.part'
+    esperado = resp.headers.get('Content-Length')
+    # Com Content-Encoding o requests entrega bytes descompactados e o total não bate
+    codificado = resp.headers.get('Content-Encoding', 'identity').lower() != 'identity'
+    h = hashlib.new(algoritmo) if algoritmo else None
+    recebidos = 0
+    cabecalho = b''
+    tipo = ''
+
+    try:
+        with open(parcial, 'wb') as f:
+            for chunk in resp.iter_content(8192):
+                if not chunk:
+                    continue
+                if len(cabecalho) < TAMANHO_CABECALHO:
+                    cabecalho += chunk[:TAMANHO_CABECALHO - len(cabecalho)]
+                    if len(cabecalho) >= TAMANHO_CABECALHO:
+                        tipo = verificar_assinatura(cabecalho, ext)
+                f.write(chunk)
+                recebidos += len(chunk)
+                if h:
+                    h.update(chunk)
+                limitar(host, len(chunk))
+
+        if recebidos == 0:
+            raise ArquivoInvalido("arquivo vazio")
+        if len(cabecalho) < TAMANHO_CABECALHO:
+            tipo = verificar_assinatura(cabecalho, ext)
+        if esperado and not codificado and int(esperado) != recebidos:
+            raise ArquivoInvalido(f"truncado: {recebidos} de {esperado} bytes")
+
+        os.replace(parcial, caminho)
+    finally:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+
+    return {
+        'caminho': caminho,
+        'bytes': recebidos,
+        'tipo': tipo,
+        'hash': f"{algoritmo}:{h.hexdigest()}" if h else None,
+    }
+
+
+def criar_sessao(cookies=None):
+    """Sessão requests com os cookies do navegador."""
+    import requests
+
+    sess = requests.Session()
+    if cookies:
+        for c in cookies:
+            sess.cookies.set(c['name'], c['value'])
+    return sess
+
+
+def baixar_uma_vez(sess, url: str, hdr: dict, caminho: str, ext: str) -> dict:
+    """
+    Uma tentativa de download. Arquivos grandes pelo Content-Length, e os sem Content-Length
+    (chunked, tamanho desconhecido), passam pela pista de grandes: se ela estiver livre o
+    download segue na mesma conexão; senão a conexão é fechada e o download recomeça só
+    quando houver vaga.
+    """
+    host = urlparse(url).hostname or ''
+    resp = sess.get(url, headers=hdr, stream=True, timeout=30)
+    resp.raise_for_status()
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+
+    tamanho = resp.headers.get('Content-Length')
+    tamanho = int(tamanho) if tamanho and tamanho.isdigit() else None
+    if tamanho is not None and tamanho <= CONFIG['limite_grande']:
+        return gravar_validando(resp, caminho, ext, CONFIG['hash'], host)
+
+    if _pista_grandes.acquire(blocking=False):
+        try:
+            return gravar_validando(resp, caminho, ext, CONFIG['hash'], host)
+        finally:
+            _pista_grandes.release()
+
+    resp.close()
+    descricao = f"{tamanho / 1024 ** 2:.0f} MB" if tamanho is not None else 'tamanho desconhecido'
+    print(f"[ℹ] Arquivo grande ({descricao}) aguardando vaga: {os.path.basename(caminho)}")
+    with _pista_grandes:
+        resp = sess.get(url, headers=hdr, stream=True, timeout=30)
+        resp.raise_for_status()
+        return gravar_validando(resp, caminho, ext, CONFIG['hash'], host)
+
+
+def baixar_arquivo(url: str, pasta: str, nome_arquivo: str = None, cookies=None, headers=None):
+    """
+    Baixa arquivo (imagem, PDF, RAR, ZIP...) validando o conteúdo durante o download.
+    Retorna um dict com caminho, bytes, tipo e hash, ou None se todas as tentativas falharem.
+    """
+    if not nome_arquivo:
+        nome_arquivo = os.path.basename(urlparse(url).path)
+    caminho = os.path.join(pasta, nome_arquivo)
+    ext = os.path.splitext(nome_arquivo)[1].lower()
+
+    sess = criar_sessao(cookies)
+    hdr = headers or {'User-Agent': 'Mozilla/5.0'}
+
+    max_tentativas = CONFIG['tentativas']
+    erro = None
+    for tentativa in range(1, max_tentativas + 1):
+        try:
+            resultado = baixar_uma_vez(sess, url, hdr, caminho, ext)
+            print(f"[✔] Arquivo baixado: {caminho} ({resultado['bytes']} bytes)")
+            if resultado['hash']:
+                print(f"[#] {resultado['hash']}  {caminho}")
+            if resultado['tipo'] in GRUPOS['imagem']:
+                pos_processamento.agendar(caminho)
+            return resultado
+        except ArquivoInvalido as e:
+            # Conteúdo ruim: tenta de novo imediatamente
+            erro = e
+            print(f"[✘] Tentativa {tentativa}/{max_tentativas}: arquivo inválido {url}: {e}")
+        except Exception as e:
+            erro = e
+            if classificar_erro(e) == 'permanente':
+                print(f"[✘] Falha permanente em {url}: {e}")
+                break
+            print(f"[✘] Tentativa {tentativa}/{max_tentativas} falhou: {e}")
+            if tentativa < max_tentativas:
+                espera = calcular_espera(tentativa, e)
+                print(f"[ℹ] Nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+    else:
+        print(f"[✘] Não foi possível baixar {url} após {max_tentativas} tentativas.")
+
+    falhas.registrar('arquivo', url, erro, classificar_erro(erro),
+                     produto=hdr.get('Referer'), pasta=pasta, nome_arquivo=nome_arquivo)
+    return None
+
+
+def consultar_tamanho(sess, url: str, headers=None):
+    """Content-Length via HEAD, ou None se o servidor não informar."""
+    try:
+        resp = sess.head(url, headers=headers, allow_redirects=True, timeout=15)
+        if resp.ok and resp.headers.get('Content-Length'):
+            return int(resp.headers['Content-Length'])
+    except Exception:
+        pass
+    return None
+
+
+def baixar_lote(arquivos, pasta: str, cookies=None, headers=None) -> list:
+    """
+    Baixa os arquivos de um produto (dicts com url e nome_arquivo) do menor para o maior.
+    Tamanhos desconhecidos entram na fila como limite_grande e, se o GET também vier sem
+    Content-Length, passam pela pista de grandes. Com CONFIG['paralelos'] > 1 os arquivos são baixados em threads; os grandes
+    continuam limitados pela pista de grandes.
+    Retorna os resultados de baixar_arquivo na ordem original.
+    """
+    arquivos = list(arquivos)
+    if len(arquivos) > 1:
+        sess = criar_sessao(cookies)
+        tamanhos = [consultar_tamanho(sess, a['url'], headers) for a in arquivos]
+    else:
+        tamanhos = [None] * len(arquivos)
+    ordem = sorted(range(len(arquivos)),
+                   key=lambda i: tamanhos[i] if tamanhos[i] is not None else CONFIG['limite_grande'])
+
+    def baixar(i):
+        a = arquivos[i]
+        resultado = baixar_arquivo(a['url'], pasta, nome_arquivo=a.get('nome_arquivo'),
+                                   cookies=cookies, headers=headers)
+        if CONFIG['pausa']:
+            time.sleep(CONFIG['pausa'])
+        return resultado
+
+    resultados = [None] * len(arquivos)
+    if CONFIG['paralelos'] > 1:
+        with ThreadPoolExecutor(max_workers=CONFIG['paralelos']) as pool:
+            for i, resultado in zip(ordem, pool.map(baixar, ordem)):
+                resultados[i] = resultado
+    else:
+        for i in ordem:
+            resultados[i] = baixar(i)
+    return resultados
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura das listas de URLs em streaming, com deduplicação:
+- Fontes: arquivo .txt (uma URL por linha, # é comentário), arquivo .jsonl
+  (campo "url" ou "link") ou '-' para a entrada padrão
+- Cada URL é canonicalizada (https, host minúsculo, sem fragmento, sem barra final,
+  caminho com percent-encoding único: bistr%C3%B4 e bistrô viram a mesma URL)
+- URLs repetidas são descartadas com um conjunto em SQLite no disco, então juntar
+  listas de várias descobertas ou shards não aumenta a memória
+
+Sozinho, grava a lista limpa na saída padrão:
+python entrada_urls.py product_links.txt outra_lista.jsonl > unicas.txt
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unicodedata
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+
+# Caracteres que ficam sem escape no caminho canônico (aspas simples viram %27, como nas listas do navegador)
+SEGUROS_CAMINHO = "/-._~!$&()*+,;=:@"
+
+PORTAS_PADRAO = {'http': 80, 'https': 443}
+
+
+def canonicalizar(url: str) -> str:
+    """Forma canônica da URL, usada para comparar e também para processar."""
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    if esquema == 'http':
+        esquema = 'https'
+    host = (partes.hostname or '').lower()
+    if partes.port and partes.port not in PORTAS_PADRAO.values():
+        host = f"{host}:{partes.port}"
+
+    caminho = unicodedata.normalize('NFC', unquote(partes.path))
+    caminho = quote(caminho, safe=SEGUROS_CAMINHO)
+    if len(caminho) > 1:
+        caminho = caminho.rstrip('/')
+
+    return urlunsplit((esquema, host, caminho, partes.query, ''))
+
+
+def ler_fonte(fonte: str):
+    """Gera as URLs de uma fonte, linha a linha, sem carregar o arquivo inteiro."""
+    if fonte == '-':
+        yield from ler_linhas(sys.stdin, jsonl=False)
+        return
+    with open(fonte, 'r', encoding='utf-8') as f:
+        yield from ler_linhas(f, jsonl=fonte.lower().endswith('.jsonl'))
+
+
+def ler_linhas(linhas, jsonl: bool = False):
+    for linha in linhas:
+        linha = linha.strip()
+        if not linha or linha.startswith('#'):
+            continue
+        if jsonl or linha.startswith('{'):
+            try:
+                dados = json.loads(linha)
+            except json.JSONDecodeError:
+                print(f"[⚠] Aviso: linha JSON inválida ignorada: {linha[:80]}", file=sys.stderr)
+                continue
+            linha = (dados.get('url') or dados.get('link') or '').strip()
+            if not linha:
+                continue
+        yield linha
+
+
+class ConjuntoVisto:
+    """
+    Conjunto de URLs já vistas guardado em SQLite. Só uma chave de 8 bytes
+    (blake2b da URL canônica) é gravada por URL. Sem caminho, usa um arquivo
+    temporário apagado no fim; com caminho, o conjunto vale entre execuções e pode
+    ser usado por vários shards ao mesmo tempo (WAL, commit a cada URL).
+    """
+
+    # Inserções por commit no conjunto temporário (o persistente grava uma a uma)
+    LOTE = 1000
+    # Segundos esperando outro processo liberar o arquivo antes de desistir
+    ESPERA_TRAVA = 30
+
+    def __init__(self, caminho: str = None):
+        self.temporario = caminho is None
+        if self.temporario:
+            fd, caminho = tempfile.mkstemp(prefix='urls_vistas_', suffix='.sqlite')
+            os.close(fd)
+        self.caminho = caminho
+        # Usado também pelas threads dos trabalhadores (ver UrlsUnicas.concluir)
+        self.conn = sqlite3.connect(caminho, timeout=self.ESPERA_TRAVA, check_same_thread=False)
+        self.lock = threading.Lock()
+        if self.temporario:
+            self.conn.execute('PRAGMA journal_mode=OFF')
+            self.conn.execute('PRAGMA synchronous=OFF')
+            self.lote = self.LOTE
+        else:
+            # Outros shards leem e gravam sem esperar uma transação longa deste processo
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.lote = 1
+        self.conn.execute('CREATE TABLE IF NOT EXISTS vistas (chave INTEGER PRIMARY KEY)')
+        self.conn.commit()
+        self.pendentes = 0
+
+    @staticmethod
+    def chave(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+    def adicionar(self, url: str) -> bool:
+        """Marca a URL como vista. Retorna True se ela ainda não estava no conjunto."""
+        with self.lock:
+            cur = self.conn.execute('INSERT OR IGNORE INTO vistas (chave) VALUES (?)', (self.chave(url),))
+            self.pendentes += 1
+            if self.pendentes >= self.lote:
+                self.conn.commit()
+                self.pendentes = 0
+            return cur.rowcount == 1
+
+    def contem(self, url: str) -> bool:
+        with self.lock:
+            cur = self.conn.execute('SELECT 1 FROM vistas WHERE chave = ?', (self.chave(url),))
+            return cur.fetchone() is not None
+
+    def fechar(self) -> None:
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+        if self.temporario:
+            os.remove(self.caminho)
+
+
+class UrlsUnicas:
+    """
+    Itera as URLs canônicas e sem repetição de várias fontes (geradores de URLs).
+    A repetição dentro da execução é descartada com um conjunto temporário. Com vistos,
+    também pula as URLs já concluídas em execuções anteriores; uma URL só entra nesse
+    conjunto por concluir(), depois que o produto foi processado com sucesso.
+    Com pular_concluidas=False (reprocessamento de falhas) o conjunto só é atualizado.
+    Conta lidas, repetidas e já concluídas para o resumo.
+    """
+
+    def __init__(self, fontes, vistos: str = None, pular_concluidas: bool = True):
+        self.fontes = fontes
+        self.concluidas = ConjuntoVisto(vistos) if vistos else None
+        self.pular_concluidas = pular_concluidas
+        self.lidas = 0
+        self.repetidas = 0
+        self.ja_concluidas = 0
+
+    def __iter__(self):
+        conjunto = ConjuntoVisto()
+        try:
+            for fonte in self.fontes:
+                for url in fonte:
+                    self.lidas += 1
+                    canonica = canonicalizar(url)
+                    if not conjunto.adicionar(canonica):
+                        self.repetidas += 1
+                    elif self.pular_concluidas and self.concluidas and self.concluidas.contem(canonica):
+                        self.ja_concluidas += 1
+                    else:
+                        yield canonica
+        finally:
+            conjunto.fechar()
+
+    def concluir(self, url: str) -> None:
+        """Marca a URL (já canônica) como concluída no conjunto persistente, se houver."""
+        if self.concluidas:
+            self.concluidas.adicionar(url)
+
+    def fechar(self) -> None:
+        if self.concluidas:
+            self.concluidas.fechar()
+            self.concluidas = None
+
+    def resumo(self) -> None:
+        print(f"[ℹ] {self.lidas} URLs lidas, {self.repetidas} repetidas descartadas"
+              + (f", {self.ja_concluidas} já concluídas antes" if self.ja_concluidas else ''))
+
+
+if __name__ == '__main__':
+    fontes = sys.argv[1:] or ['-']
+    unicas = UrlsUnicas(ler_fonte(f) for f in fontes)
+    for url in unicas:
+        print(url)
+    print(f"[ℹ] {unicas.lidas} lidas, {unicas.repetidas} repetidas", file=sys.stderr)
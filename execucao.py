@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Laço principal compartilhado pelos bots de produto (Bot_vilagress.py e biancogress.py):
+- Lê os argumentos de linha de comando
+- Lê a lista de URLs
+- Renderiza e baixa cada produto (supervisor.py no Selenium, motor_playwright.py no Playwright)
+  e mostra os tempos e a memória
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import time
+import sys
+
+import downloads
+from entrada_urls import UrlsUnicas
+import falhas
+import navegador
+import paginas_gravadas
+import pos_processamento
+from ORGANIZA_DRIVE import destino_organizado
+
+
+def pasta_do_produto(nome_base: str, destino: str = None) -> str:
+    """
+    Retorna a pasta onde os arquivos do produto devem ser gravados.
+    Sem destino, usa nome_base no diretório atual (comportamento original).
+    Com destino, já calcula RAIZ/<SITE>/<CATEGORIA>/<FORMATO>/<nome_base> com as regras
+    do ORGANIZA_DRIVE.py; produtos sem categoria ficam na raiz, como o organizador os deixaria.
+    """
+    if not destino:
+        return nome_base
+    return destino_organizado(destino, nome_base) or os.path.join(destino, nome_base)
+
+
+def criar_pasta_produto(nome_base: str, destino: str = None) -> str:
+    """Mostra e cria a pasta do produto. Retorna o caminho."""
+    print(f"[ℹ] Nome da pasta: {nome_base}")
+    pasta = pasta_do_produto(nome_base, destino)
+    if pasta != nome_base:
+        print(f"[ℹ] Destino: {pasta}")
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def falha_produto(url: str, erro: Exception) -> None:
+    """Mostra e registra no arquivo de falhas um produto que não pôde ser processado."""
+    print(f"[✘] Erro ao processar {url}: {erro}")
+    falhas.registrar('produto', url, erro, downloads.classificar_erro(erro))
+
+
+def refazer_arquivos(entradas) -> None:
+    """Baixa de novo arquivos que falharam sozinhos (sem reabrir o produto no navegador)."""
+    for i, e in enumerate(entradas, 1):
+        print(f"\n[{i}/{len(entradas)}] Arquivo: {e['url']}")
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        if e.get('produto'):
+            headers['Referer'] = e['produto']
+        downloads.baixar_arquivo(e['url'], e['pasta'], nome_arquivo=e.get('nome_arquivo'), headers=headers)
+
+
+def ler_taxas_host(valores) -> dict:
+    """Converte ['2M', 'villagres.com.br=1M'] em {'*': ..., 'villagres.com.br': ...}."""
+    taxas = {}
+    for valor in valores:
+        host, _, taxa = valor.rpartition('=')
+        taxas[host or '*'] = downloads.ler_taxa(taxa)
+    return taxas
+
+
+def inteiro_positivo(texto: str) -> int:
+    """type= do argparse para contagens de vagas (semáforos e pools não aceitam 0)."""
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"número inteiro inválido: {texto!r}")
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"precisa ser pelo menos 1: {valor}")
+    return valor
+
+
+def criar_parser(arquivo_padrao: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('arquivos', nargs='*', metavar='arquivo',
+                        help=f'arquivos com as URLs, uma por linha; .jsonl e - (entrada padrão) '
+                             f'também são aceitos (padrão: {arquivo_padrao})')
+    parser.add_argument('--vistos', metavar='ARQUIVO', default=None,
+                        help='conjunto em SQLite das URLs já concluídas com sucesso, que são puladas; '
+                             'pode ser compartilhado entre execuções e shards (--retry-failed não pula nenhuma)')
+    parser.add_argument('--destino', metavar='RAIZ', default=None,
+                        help='grava direto em RAIZ/<SITE>/<CATEGORIA>/<FORMATO>/, '
+                             'dispensando o ORGANIZA_DRIVE.py depois')
+    parser.add_argument('--hash', metavar='ALGORITMO', default=None,
+                        choices=sorted(hashlib.algorithms_guaranteed),
+                        help='calcula o hash de cada arquivo durante o download (ex.: sha256) '
+                             'e registra na saída')
+    parser.add_argument('--banda', metavar='TAXA', type=downloads.ler_taxa, default=None,
+                        help='orçamento global de download, ex.: 4M (bytes/s; padrão: sem limite)')
+    parser.add_argument('--janela-banda', metavar='HH:MM-HH:MM=TAXA', type=downloads.ler_janela,
+                        action='append', default=[],
+                        help='orçamento global num horário, ex.: 08:00-18:00=1M (pode repetir)')
+    parser.add_argument('--banda-host', metavar='[HOST=]TAXA', action='append', default=[],
+                        help='limite por host; sem HOST vale para cada host (pode repetir)')
+    parser.add_argument('--downloads-paralelos', metavar='N', type=int, default=1,
+                        help='downloads simultâneos por produto (padrão: 1)')
+    parser.add_argument('--grandes', metavar='N', type=inteiro_positivo, default=1,
+                        help='arquivos grandes baixando ao mesmo tempo (padrão: 1)')
+    parser.add_argument('--limite-grande', metavar='MB', type=int, default=50,
+                        help='a partir de quantos MB um arquivo é grande (padrão: 50)')
+    parser.add_argument('--tentativas', metavar='N', type=int, default=3,
+                        help='tentativas por arquivo (padrão: 3)')
+    parser.add_argument('--espera-base', metavar='S', type=float, default=1.0,
+                        help='espera antes da 2ª tentativa; dobra a cada nova tentativa, '
+                             'com jitter (padrão: 1)')
+    parser.add_argument('--espera-max', metavar='S', type=float, default=60.0,
+                        help='espera máxima entre tentativas (padrão: 60)')
+    parser.add_argument('--falhas', metavar='ARQUIVO', default=falhas.ARQUIVO_PADRAO,
+                        help=f'onde registrar produtos e arquivos que falharam (padrão: {falhas.ARQUIVO_PADRAO})')
+    parser.add_argument('--retry-failed', metavar='ARQUIVO', default=None,
+                        help='reprocessa só as falhas registradas em ARQUIVO, em vez da lista de URLs')
+    parser.add_argument('--incluir-permanentes', action='store_true',
+                        help='com --retry-failed, tenta de novo também as falhas permanentes (404, 403...)')
+    parser.add_argument('--chromedriver', metavar='CAMINHO', default=None,
+                        help='usa este chromedriver em vez de resolver pelo webdriver_manager')
+    parser.add_argument('--offline', action='store_true',
+                        help='não consulta a rede para achar o chromedriver (usa o cache ou --chromedriver)')
+    parser.add_argument('--cache-navegador', metavar='PASTA', default=None,
+                        help='cache HTTP do Chrome em disco, mantido entre produtos e execuções '
+                             '(uma subpasta por Chrome; só motor selenium)')
+    parser.add_argument('--cache-tamanho', metavar='MB', type=int, default=300,
+                        help='tamanho máximo do cache de cada Chrome (padrão: 300)')
+    parser.add_argument('--gravar', metavar='PASTA', default=None,
+                        help='grava o HTML renderizado e os dados extraídos de cada produto em '
+                             'PASTA/<data>/ (comprimido), para o --replay')
+    parser.add_argument('--replay', metavar='PASTA', default=None,
+                        help='reextrai nomes de pasta e metadados das páginas gravadas com --gravar, '
+                             'sem navegador nem rede')
+    parser.add_argument('--replay-saida', metavar='ARQUIVO', default=None,
+                        help='com --replay, grava o resultado em JSONL')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='só lista as URLs que seriam processadas, sem abrir navegador')
+    parser.add_argument('--sem-screenshot', action='store_true',
+                        help='não tira o screenshot.png (o Chrome então carrega as páginas sem imagens)')
+    parser.add_argument('--navegador-completo', action='store_true',
+                        help='usa o Chrome padrão em vez do perfil enxuto de scraping')
+    parser.add_argument('--motor', choices=['selenium', 'playwright'], default='selenium',
+                        help='selenium: --trabalhadores Chromes reaproveitados entre produtos e '
+                             'reciclados (padrão); playwright: vários contextos em um único Chromium')
+    parser.add_argument('--paginas', metavar='N', type=inteiro_positivo, default=10,
+                        help='páginas simultâneas do motor playwright (padrão: 10)')
+    parser.add_argument('--produtos-baixando', metavar='N', type=inteiro_positivo, default=4,
+                        help='produtos baixando ao mesmo tempo no motor playwright (padrão: 4)')
+    parser.add_argument('--trabalhadores', metavar='N', type=inteiro_positivo, default=1,
+                        help='Chromes simultâneos do motor selenium (padrão: 1)')
+    parser.add_argument('--paginas-por-navegador', metavar='N', type=inteiro_positivo, default=25,
+                        help='recicla o Chrome depois de N produtos (padrão: 25)')
+    parser.add_argument('--limite-rss', metavar='MB', type=int, default=1500,
+                        help='recicla o Chrome quando ele passar de MB de memória (padrão: 1500)')
+    parser.add_argument('--timeout-pagina', metavar='S', type=int, default=60,
+                        help='tempo máximo de carregamento de uma página (padrão: 60)')
+    parser.add_argument('--timeout-script', metavar='S', type=int, default=30,
+                        help='tempo máximo de um script assíncrono na página (padrão: 30)')
+    parser.add_argument('--timeout-produto', metavar='S', type=int, default=180,
+                        help='mata o Chrome travado há mais de S segundos no mesmo produto (padrão: 180)')
+    parser.add_argument('--reenfileirar', metavar='N', type=int, default=1,
+                        help='vezes que um produto travado volta para a fila antes de ir para as falhas '
+                             '(padrão: 1)')
+    parser.add_argument('--pos-processar', action='store_true',
+                        help='gera miniaturas e cópias WebP das imagens em um pool de processos')
+    parser.add_argument('--miniatura', metavar='PX', type=int, default=None,
+                        help='maior lado das miniaturas (padrão: 400)')
+    parser.add_argument('--sem-webp', action='store_true', help='não gera as cópias WebP')
+    parser.add_argument('--max-lado', metavar='PX', type=int, default=None,
+                        help='reduz imagens originais maiores que PX pixels')
+    parser.add_argument('--processos', metavar='N', type=inteiro_positivo, default=None,
+                        help='processos do pós-processamento (padrão: número de CPUs)')
+    return parser
+
+
+def executar(bot, argv=None) -> None:
+    """
+    Processa todas as URLs do arquivo com o bot (módulo Bot_vilagress ou biancogress),
+    que precisa oferecer ARQUIVO_URLS, ler_urls_do_arquivo, PERFIL_NAVEGADOR, renderizar,
+    baixar_produto e, para o motor playwright, extrair_produto e as esperas da página.
+    """
+    arquivo_padrao = bot.ARQUIVO_URLS
+    parser = criar_parser(arquivo_padrao)
+    args = parser.parse_args(argv)
+    if args.cache_navegador and args.motor == 'selenium' and not navegador.verifica_processos():
+        parser.error('--cache-navegador no Windows precisa do psutil (pip install psutil) para '
+                     'liberar as reservas de cache de execuções encerradas')
+
+    if args.replay:
+        paginas_gravadas.replay(bot, args.replay, destino=args.destino, saida=args.replay_saida)
+        return
+
+    falhas.configurar(args.falhas)
+    arquivos_falhos = []
+
+    if args.retry_failed:
+        # No dry-run o arquivo de falhas só é lido: nada é renomeado nem regravado
+        entradas = falhas.ler(args.retry_failed) if args.dry_run else falhas.preparar_retry(args.retry_failed)
+        produtos, arquivos_falhos, ignoradas = falhas.separar(entradas, args.incluir_permanentes)
+        # Falhas permanentes não reprocessadas continuam no arquivo de falhas
+        if not args.dry_run:
+            for entrada in ignoradas:
+                falhas.manter(entrada)
+        print(f"[ℹ] Reprocessando falhas de {args.retry_failed}: "
+              f"{len(produtos)} produtos, {len(arquivos_falhos)} arquivos")
+        fontes = [produtos]
+    else:
+        # Verifica se foram passados arquivos de URLs como argumento
+        arquivos_urls = args.arquivos
+        if not arquivos_urls:
+            arquivos_urls = [arquivo_padrao]
+            print(f"[ℹ] Nenhum arquivo especificado. Usando o padrão: {arquivo_padrao}")
+
+        # Lê as URLs em streaming, uma fonte depois da outra
+        fontes = (bot.ler_urls_do_arquivo(arquivo) for arquivo in arquivos_urls)
+
+    # Canonicaliza e descarta repetidas sem carregar a lista inteira.
+    # Com --retry-failed as falhas são sempre reprocessadas; --vistos só registra as que derem certo
+    unicas = UrlsUnicas(fontes, vistos=args.vistos, pular_concluidas=not args.retry_failed)
+    urls = iter(unicas)
+    primeira = next(urls, None)
+    if primeira is None and not arquivos_falhos:
+        unicas.resumo()
+        unicas.fechar()
+        print("[✘] Nenhuma URL para processar. Saindo.")
+        sys.exit(1)
+    urls = itertools.chain([primeira], urls) if primeira is not None else iter(())
+
+    if args.dry_run:
+        for i, url in enumerate(urls, 1):
+            print(f"[{i}] {url}")
+        for e in arquivos_falhos:
+            print(f"[arquivo] {e['url']} -> {e['pasta']}")
+        unicas.resumo()
+        unicas.fechar()
+        print(f"[ℹ] {len(arquivos_falhos)} arquivos a refazer (dry-run: nada foi baixado)")
+        return
+
+    downloads.CONFIG['hash'] = args.hash
+    downloads.CONFIG['tentativas'] = args.tentativas
+    downloads.CONFIG['espera_base'] = args.espera_base
+    downloads.CONFIG['espera_max'] = args.espera_max
+    downloads.CONFIG['paralelos'] = args.downloads_paralelos
+    downloads.CONFIG['limite_grande'] = args.limite_grande * 1024 * 1024
+    downloads.configurar_banda(args.banda, args.janela_banda, ler_taxas_host(args.banda_host), args.grandes)
+    navegador.CONFIG['screenshot'] = not args.sem_screenshot
+    navegador.CONFIG['enxuto'] = not args.navegador_completo
+    navegador.CONFIG['chromedriver'] = args.chromedriver
+    navegador.CONFIG['offline'] = args.offline
+    paginas_gravadas.CONFIG['pasta'] = args.gravar
+    navegador.CONFIG['cache'] = args.cache_navegador
+    navegador.CONFIG['tamanho_cache'] = args.cache_tamanho * 1024 * 1024
+    if args.pos_processar:
+        pos_processamento.iniciar(args.processos, miniatura=args.miniatura,
+                                  webp=not args.sem_webp, max_lado=args.max_lado)
+
+    if args.destino:
+        print(f"[ℹ] Gravando direto na estrutura organizada em: {args.destino}")
+
+    # Processa cada URL
+    start_total = time.time()
+
+    if args.motor == 'playwright':
+        import motor_playwright
+        total_urls = motor_playwright.executar(bot, urls, paginas=args.paginas, destino=args.destino,
+                                               concluido=unicas.concluir, baixando=args.produtos_baixando)
+    else:
+        import supervisor
+        supervisor.CONFIG['trabalhadores'] = args.trabalhadores
+        supervisor.CONFIG['paginas_por_navegador'] = args.paginas_por_navegador
+        supervisor.CONFIG['limite_rss'] = args.limite_rss * 1024 * 1024
+        supervisor.CONFIG['timeout_pagina'] = args.timeout_pagina
+        supervisor.CONFIG['timeout_script'] = args.timeout_script
+        supervisor.CONFIG['timeout_produto'] = args.timeout_produto
+        supervisor.CONFIG['reenfileirar'] = args.reenfileirar
+        total_urls = supervisor.executar(bot, urls, destino=args.destino, concluido=unicas.concluir)
+
+    refazer_arquivos(arquivos_falhos)
+
+    pos_processamento.finalizar()
+
+    total_time = time.time() - start_total
+    print(f"\n[⏱] Total: {total_time:.2f}s para processar {total_urls} URLs")
+    if total_urls:
+        print(f"[ℹ] Média: {total_time/total_urls:.2f}s por URL")
+        import supervisor
+        supervisor.resumo()
+        navegador.resumo_cache()
+    unicas.resumo()
+    unicas.fechar()
+    falhas.resumo()
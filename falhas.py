@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arquivo de falhas (dead-letter) dos bots de produto.
+Cada produto ou arquivo que falha de vez vira uma linha JSON em falhas.jsonl:
+
+{"quando": "...", "tipo": "produto", "url": "...", "erro": "...", "classe": "transitorio"}
+{"quando": "...", "tipo": "arquivo", "url": "...", "erro": "...", "classe": "permanente",
+ "produto": "<url do produto>", "pasta": "...", "nome_arquivo": "..."}
+
+O mesmo arquivo pode ser passado de volta com --retry-failed para reprocessar só o que falhou.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+ARQUIVO_PADRAO = 'falhas.jsonl'
+
+_caminho = ARQUIVO_PADRAO
+_lock = threading.Lock()
+_contagem = {'produto': 0, 'arquivo': 0}
+
+
+def configurar(caminho: str) -> None:
+    global _caminho
+    _caminho = caminho
+    _contagem.update(produto=0, arquivo=0)
+
+
+def registrar(tipo: str, url: str, erro, classe: str, **extra) -> None:
+    """Acrescenta uma falha ao arquivo (seguro entre threads)."""
+    entrada = {
+        'quando': datetime.now().isoformat(timespec='seconds'),
+        'tipo': tipo,
+        'url': url,
+        'erro': str(erro),
+        'classe': classe,
+    }
+    entrada.update(extra)
+    manter(entrada)
+
+
+def manter(entrada: dict) -> None:
+    """Grava uma falha já montada (também usado para carregar falhas não reprocessadas)."""
+    with _lock:
+        with open(_caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+        _contagem[entrada['tipo']] = _contagem.get(entrada['tipo'], 0) + 1
+
+
+def ler(caminho: str) -> list:
+    """Lê as falhas registradas, ignorando linhas corrompidas."""
+    entradas = []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                entradas.append(json.loads(linha))
+            except json.JSONDecodeError:
+                print(f"[⚠] Aviso: linha inválida em {caminho}: {linha[:80]}")
+    return entradas
+
+
+def separar(entradas, incluir_permanentes: bool = False) -> tuple:
+    """
+    Divide as falhas em (produtos, arquivos, ignoradas).
+    Arquivos de produtos que serão reprocessados inteiros são descartados, e falhas
+    permanentes (404, 403...) de arquivos só voltam com incluir_permanentes; sem isso
+    ficam em ignoradas, para continuarem registradas.
+    """
+    produtos = list(dict.fromkeys(e['url'] for e in entradas if e['tipo'] == 'produto'))
+    ja_cobertos = set(produtos)
+    arquivos, ignoradas, vistos = [], [], set()
+    for e in entradas:
+        if e['tipo'] != 'arquivo' or e.get('produto') in ja_cobertos or e['url'] in vistos:
+            continue
+        if e['classe'] == 'permanente' and not incluir_permanentes:
+            print(f"[ ] Falha permanente ignorada: {e['url']} ({e['erro']})")
+            ignoradas.append(e)
+            continue
+        vistos.add(e['url'])
+        arquivos.append(e)
+    return produtos, arquivos, ignoradas
+
+
+def nome_backup(caminho: str) -> str:
+    """<caminho>.anterior-<data-hora>, com contador se já existir: um backup nunca sobrescreve outro."""
+    base = f"{caminho}.anterior-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    backup, n = base, 1
+    while os.path.exists(backup):
+        backup = f"{base}-{n}"
+        n += 1
+    return backup
+
+
+def preparar_retry(caminho: str) -> list:
+    """
+    Lê o arquivo de falhas a reprocessar e, se ele for o próprio arquivo de falhas ativo, o guarda
+    como <caminho>.anterior-<data-hora>, para que as falhas da nova execução não se misturem com
+    as antigas. Backups anteriores nunca são sobrescritos: se a execução for interrompida, as
+    falhas que ela não alcançou continuam no backup.
+    """
+    entradas = ler(caminho)
+    if os.path.abspath(caminho) == os.path.abspath(_caminho):
+        backup = nome_backup(caminho)
+        os.replace(caminho, backup)
+        print(f"[ℹ] Falhas anteriores guardadas em {backup}")
+    return entradas
+
+
+def resumo() -> None:
+    if _contagem['produto'] or _contagem['arquivo']:
+        print(f"[⚠] Falhas: {_contagem['produto']} produtos, {_contagem['arquivo']} arquivos "
+              f"registrados em {_caminho} (use --retry-failed {_caminho})")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor alternativo de scraping dos produtos com Playwright (async):
+- Um único Chromium para a execução inteira
+- Um BrowserContext isolado por produto (cookies e armazenamento limpos a cada produto)
+- Até N páginas abertas ao mesmo tempo, controladas por asyncio
+
+A extração é a mesma do Selenium (extrair_produto do bot) e a estrutura de pastas também.
+Os downloads usam baixar_produto do bot num pool de threads próprio, para não travar o laço de
+eventos nem disputar threads com a extração.
+
+Pré-requisitos:
+pip install playwright
+playwright install chromium
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+import navegador
+import paginas_gravadas
+import pos_processamento
+import supervisor
+from execucao import criar_pasta_produto, falha_produto
+
+
+def bloquear(perfil: dict):
+    """Cria o handler de rota que descarta terceiros e, se o perfil pedir, imagens e fontes."""
+    hosts = tuple(perfil['hosts_bloqueados'])
+    tipos = set() if perfil['imagens'] else {'image', 'media', 'font'}
+
+    async def handler(route):
+        req = route.request
+        host = urlparse(req.url).hostname or ''
+        if req.resource_type in tipos or any(host == h or host.endswith('.' + h) for h in hosts):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return handler
+
+
+async def preparar_pagina(page, bot) -> None:
+    """Mesma espera e clique de especificações do Selenium."""
+    await page.wait_for_timeout(bot.ESPERA_PAGINA * 1000)
+    if bot.XPATH_ESPECIFICACOES:
+        try:
+            await page.locator(f'xpath={bot.XPATH_ESPECIFICACOES}').first.click(timeout=3000)
+            await page.wait_for_timeout(bot.ESPERA_CLIQUE * 1000)
+        except Exception:
+            # Se não encontrar o botão, continua normalmente
+            pass
+
+
+async def renderizar(browser, bot, link: str, destino: str = None) -> tuple:
+    """
+    Abre o produto em um contexto próprio, extrai os dados e tira o screenshot.
+    Retorna o que baixar_produto precisa; o contexto já está fechado no retorno.
+    """
+    perfil = navegador.montar_perfil(bot.PERFIL_NAVEGADOR)
+    largura, altura = perfil['janela']
+    context = await browser.new_context(viewport={'width': largura, 'height': altura})
+    try:
+        if navegador.CONFIG['enxuto']:
+            await context.route('**/*', bloquear(perfil))
+        page = await context.new_page()
+        espera = 'domcontentloaded' if perfil['estrategia'] == 'eager' else 'load'
+        await page.goto(link, wait_until=espera)
+        await preparar_pagina(page, bot)
+
+        html = await page.content()
+        produto = await asyncio.to_thread(bot.extrair_produto, html, link)
+        await asyncio.to_thread(paginas_gravadas.gravar, link, html, produto)
+        pasta = criar_pasta_produto(produto['nome_base'], destino)
+
+        if navegador.CONFIG['screenshot']:
+            caminho = os.path.join(pasta, 'screenshot.png')
+            await page.screenshot(path=caminho, full_page=True)
+            print(f"[✔] Screenshot salvo em: {caminho}")
+            pos_processamento.agendar(caminho)
+
+        navegador.medir_cache(await page.evaluate(navegador.JS_RECURSOS))
+        cookies = await context.cookies()
+        headers = {'User-Agent': await page.evaluate('navigator.userAgent'), 'Referer': link}
+    finally:
+        await context.close()
+    return produto, pasta, cookies, headers
+
+
+def baixar(bot, url: str, produto: dict, pasta: str, cookies, headers, start: float, concluido=None) -> None:
+    """Parte do produto que roda no pool de downloads: baixa os arquivos e mede a memória."""
+    bot.baixar_produto(produto, pasta, cookies, headers)
+    # Chromium, driver do Playwright e o próprio Python são todos descendentes deste processo
+    rss = supervisor.medir_rss(os.getpid(), arvore=True)
+    supervisor.registrar_pico('pico_navegador', rss)
+    supervisor.registrar_pico('pico_processo', supervisor.medir_rss(os.getpid()))
+    print(f"[⏱] {time.time() - start:.2f}s para processar {url} "
+          f"(memória total {rss / supervisor.MB:.0f} MB)")
+    if concluido:
+        concluido(url)
+
+
+async def executar_async(bot, urls, paginas: int = 10, destino: str = None, concluido=None,
+                         baixando: int = 4) -> int:
+    """
+    Processa as URLs (qualquer iterável, lido aos poucos) com até `paginas` contextos
+    simultâneos. Os downloads rodam num pool próprio de `baixando` threads, separado do
+    executor padrão usado pela extração; no máximo 2 x `baixando` produtos renderizados
+    ficam baixando ou esperando vaga, e com isso cheio a leitura de URLs para.
+    concluido(url) é chamado para cada produto processado com sucesso.
+    Retorna quantas URLs foram processadas.
+    """
+    limite = asyncio.Semaphore(paginas)
+    fila_downloads = asyncio.Semaphore(baixando * 2)
+    pool = ThreadPoolExecutor(max_workers=baixando, thread_name_prefix='download')
+    loop = asyncio.get_running_loop()
+    pendentes = set()
+    total = 0
+
+    async with async_playwright() as p:
+        # Sem limite de renderers: aqui as páginas simultâneas dividem o mesmo Chromium
+        args = [a for a in navegador.PERFIL_PADRAO['argumentos']
+                if not a.startswith('--renderer-process-limit')]
+        browser = await p.chromium.launch(headless=True, args=args)
+
+        async def tarefa(i, url):
+            start = time.time()
+            try:
+                # A vaga de página só é liberada quando o produto tem lugar na fila de downloads,
+                # então downloads lentos seguram a leitura de novas URLs
+                try:
+                    print(f"\n[{i}] Processando: {url}")
+                    produto, pasta, cookies, headers = await renderizar(browser, bot, url, destino)
+                    await fila_downloads.acquire()
+                finally:
+                    limite.release()
+                try:
+                    await loop.run_in_executor(pool, baixar, bot, url, produto, pasta, cookies, headers,
+                                               start, concluido)
+                finally:
+                    fila_downloads.release()
+            except Exception as e:
+                falha_produto(url, e)
+
+        try:
+            for total, url in enumerate(urls, 1):
+                # Só lê a próxima URL quando houver vaga de página
+                await limite.acquire()
+                t = asyncio.create_task(tarefa(total, url))
+                pendentes.add(t)
+                t.add_done_callback(pendentes.discard)
+
+            await asyncio.gather(*pendentes)
+        finally:
+            pool.shutdown(wait=True)
+        await browser.close()
+    return total
+
+
+def executar(bot, urls, paginas: int = 10, destino: str = None, concluido=None, baixando: int = 4) -> int:
+    print(f"[ℹ] Motor Playwright: até {paginas} páginas simultâneas em um Chromium, "
+          f"{baixando} produtos baixando")
+    if navegador.CONFIG['cache']:
+        # Contextos isolados são anônimos: o Chromium guarda o cache deles só em memória
+        print("[⚠] Aviso: --cache-navegador vale só para o motor selenium; "
+              "aqui cada contexto usa só o cache em memória")
+    return asyncio.run(executar_async(bot, urls, paginas, destino, concluido, baixando))
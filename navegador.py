@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Criação do Chrome usado pelos bots de produto, com um perfil enxuto para scraping:
+- Estratégia de carregamento 'eager' (não espera imagens, fontes e iframes)
+- Imagens desligadas, exceto quando a página vai ser fotografada (screenshot)
+- Hosts de terceiros (analytics, pixels, chat) bloqueados via CDP
+- Flags que reduzem a memória de cada processo
+
+Cada bot define seu PERFIL_NAVEGADOR com o que for diferente do PERFIL_PADRAO.
+
+Com CONFIG['cache'] cada Chrome usa um cache HTTP em disco persistente e com tamanho máximo
+(--disk-cache-dir / --disk-cache-size): CSS, JS e fontes do site ficam guardados entre produtos
+e entre execuções. Cada Chrome reserva a sua subpasta (chrome-1, chrome-2...), então vários
+trabalhadores e execuções simultâneas não disputam o mesmo cache.
+
+O caminho do chromedriver é resolvido uma vez e guardado em disco (CACHE_CHROMEDRIVER),
+em vez de chamar ChromeDriverManager().install() a cada produto. Se o Chrome recusar o
+driver do cache (Chrome atualizado), o cache é descartado e o driver resolvido de novo. Selenium e
+webdriver_manager só são importados quando um navegador é de fato criado.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+
+# Configuração global do navegador (ajustada por execucao.py)
+CONFIG = {
+    'screenshot': True,    # False pula o screenshot.png e permite desligar as imagens
+    'enxuto': True,        # False volta ao Chrome padrão (só --headless)
+    'chromedriver': None,  # caminho fixo do chromedriver (também via CHROMEDRIVER no ambiente)
+    'offline': False,      # nunca consulta a rede para achar o chromedriver
+    'cache': None,         # pasta do cache HTTP persistente (None: cache descartado com o perfil)
+    'tamanho_cache': 300 * 1024 * 1024,  # tamanho máximo do cache de cada Chrome (bytes)
+}
+
+CACHE_CHROMEDRIVER = os.path.join(os.path.expanduser('~'), '.cache', 'bots-dowload', 'chromedriver.json')
+# Depois disso o webdriver_manager é consultado de novo (versão do Chrome pode ter mudado)
+VALIDADE_CACHE = 7 * 24 * 3600
+
+_chromedriver = None
+_chromedriver_do_cache = False  # o caminho em uso veio do CACHE_CHROMEDRIVER
+_chromedriver_lock = threading.Lock()
+
+# Tamanhos de cada recurso da página (documento incluído), para medir o aproveitamento do cache
+JS_RECURSOS = ("performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))"
+               ".map(e => [e.transferSize, e.encodedBodySize, e.decodedBodySize])")
+
+_cache = {'paginas': 0, 'recursos': 0, 'do_cache': 0, 'sem_dados': 0, 'transferidos': 0, 'economizados': 0}
+_cache_lock = threading.Lock()
+
+# Hosts de terceiros que não influenciam a extração
+HOSTS_TERCEIROS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'clarity.ms',
+    'tiktok.com',
+    'linkedin.com',
+    'rdstation.com.br',
+    'rdstation.com',
+    'zendesk.com',
+    'jivosite.com',
+    'youtube.com',
+    'vimeo.com',
+]
+
+PERFIL_PADRAO = {
+    'estrategia': 'eager',
+    'imagens': False,
+    'hosts_bloqueados': HOSTS_TERCEIROS,
+    'janela': (1920, 1080),
+    'argumentos': [
+        '--disable-gpu',
+        '--disable-dev-shm-usage',
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-default-apps',
+        '--disable-sync',
+        '--disable-features=Translate,OptimizationHints,MediaRouter',
+        '--no-first-run',
+        '--mute-audio',
+        '--renderer-process-limit=2',
+    ],
+}
+
+
+def montar_perfil(perfil_site: dict = None) -> dict:
+    """Junta o perfil padrão com o do site e aplica as opções globais."""
+    perfil = dict(PERFIL_PADRAO)
+    perfil.update(perfil_site or {})
+    # Sem imagens o screenshot sai com buracos: liga as imagens quando ele for tirado
+    if CONFIG['screenshot']:
+        perfil['imagens'] = True
+    return perfil
+
+
+def padroes_bloqueio(hosts) -> list:
+    """Padrões de URL para Network.setBlockedURLs (host e subdomínios)."""
+    padroes = []
+    for host in hosts:
+        padroes += [f'*://{host}/*', f'*://*.{host}/*']
+    return padroes
+
+
+def ler_cache_chromedriver():
+    """Retorna (caminho, idade em segundos) do cache em disco, ou (None, None)."""
+    try:
+        with open(CACHE_CHROMEDRIVER, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        if os.path.isfile(dados['caminho']):
+            return dados['caminho'], time.time() - dados['quando']
+    except (OSError, ValueError, KeyError):
+        pass
+    return None, None
+
+
+def gravar_cache_chromedriver(caminho: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_CHROMEDRIVER), exist_ok=True)
+        temporario = f"{CACHE_CHROMEDRIVER}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'caminho': caminho, 'quando': time.time()}, f)
+        os.replace(temporario, CACHE_CHROMEDRIVER)
+    except OSError as e:
+        print(f"[⚠] Aviso: não foi possível gravar o cache do chromedriver: {e}")
+
+
+def resolver_chromedriver() -> str:
+    """
+    Caminho do chromedriver, nesta ordem:
+    1. Caminho fixo (--chromedriver ou variável CHROMEDRIVER)
+    2. Cache em disco, se ainda válido (no modo offline vale sempre)
+    3. ChromeDriverManager().install(), que consulta a rede; o resultado vai para o cache
+    O resultado fica em memória pelo resto da execução (ver descartar_chromedriver).
+    """
+    global _chromedriver, _chromedriver_do_cache
+    with _chromedriver_lock:
+        if _chromedriver:
+            return _chromedriver
+
+        fixo = CONFIG['chromedriver'] or os.environ.get('CHROMEDRIVER')
+        if fixo:
+            if not os.path.isfile(fixo):
+                raise FileNotFoundError(f"chromedriver não encontrado em {fixo}")
+            _chromedriver = fixo
+            return _chromedriver
+
+        caminho, idade = ler_cache_chromedriver()
+        if caminho and (CONFIG['offline'] or idade < VALIDADE_CACHE):
+            _chromedriver = caminho
+            _chromedriver_do_cache = True
+            return _chromedriver
+
+        if CONFIG['offline']:
+            raise RuntimeError("modo offline sem chromedriver em cache: informe --chromedriver CAMINHO")
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        _chromedriver = ChromeDriverManager().install()
+        _chromedriver_do_cache = False
+        gravar_cache_chromedriver(_chromedriver)
+        print(f"[ℹ] chromedriver: {_chromedriver}")
+        return _chromedriver
+
+
+def descartar_chromedriver(caminho: str) -> bool:
+    """
+    Chamada quando o Chrome não abre com o chromedriver em caminho (ex.: o Chrome foi
+    atualizado e o driver em cache ficou para trás). Se o caminho veio do cache em disco,
+    apaga o cache e esquece o caminho, para que resolver_chromedriver consulte o
+    webdriver_manager de novo. Retorna False quando não há o que tentar: caminho fixo ou
+    modo offline.
+    """
+    global _chromedriver, _chromedriver_do_cache
+    with _chromedriver_lock:
+        if _chromedriver != caminho:
+            return True  # outro trabalhador já descartou
+        if not _chromedriver_do_cache or CONFIG['offline']:
+            return False
+        try:
+            os.remove(CACHE_CHROMEDRIVER)
+        except OSError:
+            pass
+        _chromedriver = None
+        _chromedriver_do_cache = False
+        return True
+
+
+def verifica_processos() -> bool:
+    """
+    False no Windows sem psutil: lá processo_vivo não tem como saber se o dono de uma reserva
+    de cache terminou, e as subpastas de execuções encerradas nunca seriam reaproveitadas.
+    """
+    if os.name != 'nt':
+        return True
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def processo_vivo(pid: int) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == 'nt':
+        # Sem psutil não há como verificar com segurança (os.kill encerraria o processo)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reservar_cache(raiz: str) -> str:
+    """
+    Reserva a primeira subpasta livre de raiz (chrome-1, chrome-2...) para um Chrome.
+    A reserva é o arquivo em_uso.pid, criado de forma atômica; reservas de processos
+    que já terminaram são reaproveitadas.
+    """
+    for k in itertools.count(1):
+        pasta = os.path.join(raiz, f'chrome-{k}')
+        trava = os.path.join(pasta, 'em_uso.pid')
+        os.makedirs(pasta, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(trava, 'r') as f:
+                        dono = int(f.read().strip() or 0)
+                except (OSError, ValueError):
+                    dono = 0
+                # Sem pid legível pode ser uma reserva sendo gravada agora: trata como ocupada
+                if not dono or processo_vivo(dono):
+                    break
+                try:
+                    os.remove(trava)
+                except OSError:
+                    break
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return pasta
+
+
+def liberar_cache(pasta: str) -> None:
+    try:
+        os.remove(os.path.join(pasta, 'em_uso.pid'))
+    except OSError:
+        pass
+
+
+def medir_cache(recursos) -> dict:
+    """
+    Conta, a partir das entradas [transferSize, encodedBodySize, decodedBodySize] de
+    JS_RECURSOS, quantos recursos vieram do cache (transferSize 0 com corpo não vazio).
+    Recursos de outros domínios sem Timing-Allow-Origin não informam tamanhos e ficam em sem_dados.
+    Soma a página nas estatísticas da execução e retorna as da página.
+    """
+    pagina = {'paginas': 1, 'recursos': 0, 'do_cache': 0, 'sem_dados': 0, 'transferidos': 0, 'economizados': 0}
+    for transferido, codificado, decodificado in recursos or []:
+        if not decodificado:
+            pagina['sem_dados'] += 1
+            continue
+        pagina['recursos'] += 1
+        pagina['transferidos'] += transferido or 0
+        if not transferido:
+            pagina['do_cache'] += 1
+            pagina['economizados'] += codificado or 0
+    with _cache_lock:
+        for chave, valor in pagina.items():
+            _cache[chave] += valor
+    return pagina
+
+
+def medir_cache_driver(driver) -> dict:
+    """medir_cache da página aberta no Selenium; None se a página não responder."""
+    try:
+        return medir_cache(driver.execute_script('return ' + JS_RECURSOS))
+    except Exception:
+        return None
+
+
+def resumo_cache() -> None:
+    c = _cache
+    if not c['paginas']:
+        return
+    taxa = 100 * c['do_cache'] / c['recursos'] if c['recursos'] else 0
+    print(f"[ℹ] Cache do navegador: {c['do_cache']}/{c['recursos']} recursos do cache ({taxa:.0f}%), "
+          f"{c['transferidos'] / 1024 / 1024:.1f} MB transferidos, "
+          f"{c['economizados'] / 1024 / 1024:.1f} MB economizados em {c['paginas']} páginas"
+          + (f" ({c['sem_dados']} recursos de terceiros sem dados)" if c['sem_dados'] else ''))
+
+
+def abrir_chrome(opts):
+    """
+    Abre o Chrome com o chromedriver resolvido. Se a sessão não abrir com o driver do cache
+    em disco, descarta o cache e tenta uma vez com o driver baixado de novo.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    caminho = resolver_chromedriver()
+    try:
+        return webdriver.Chrome(service=Service(caminho), options=opts)
+    except SessionNotCreatedException:
+        if not descartar_chromedriver(caminho):
+            raise
+        print(f"[⚠] Chrome não abriu com o chromedriver em cache ({caminho}), resolvendo de novo")
+    return webdriver.Chrome(service=Service(resolver_chromedriver()), options=opts)
+
+
+def criar_driver(perfil_site: dict = None, cache: str = None):
+    """
+    Cria o Chrome headless com o perfil do site. cache é a pasta do cache HTTP em disco
+    (uma por Chrome, ver reservar_cache); sem ela o cache some junto com o perfil temporário.
+    """
+    from selenium import webdriver
+
+    opts = webdriver.ChromeOptions()
+    opts.add_argument('--headless')
+    if cache:
+        opts.add_argument(f'--disk-cache-dir={os.path.abspath(cache)}')
+        opts.add_argument(f"--disk-cache-size={CONFIG['tamanho_cache']}")
+
+    if not CONFIG['enxuto']:
+        driver = abrir_chrome(opts)
+        driver.set_window_size(1920, 1080)
+        return driver
+
+    perfil = montar_perfil(perfil_site)
+    opts.page_load_strategy = perfil['estrategia']
+    for arg in perfil['argumentos']:
+        opts.add_argument(arg)
+    if not perfil['imagens']:
+        opts.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    driver = abrir_chrome(opts)
+    driver.set_window_size(*perfil['janela'])
+
+    if perfil['hosts_bloqueados']:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs',
+                                   {'urls': padroes_bloqueio(perfil['hosts_bloqueados'])})
+        except Exception as e:
+            print(f"[⚠] Aviso: não foi possível bloquear hosts de terceiros: {e}")
+    return driver
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação das páginas renderizadas para reextração offline:
+- Com --gravar PASTA, o HTML renderizado de cada produto e o que foi extraído dele (nome da pasta,
+  especificações e URLs dos botões de download) vão para PASTA/<AAAA-MM-DD>/<sha1 da URL>.json.gz
+- Com --replay PASTA, extrair_produto do bot roda de novo sobre as páginas gravadas, sem navegador
+  nem rede: serve para conferir nomes de pasta e metadados depois de corrigir os seletores
+
+No replay vale a gravação mais recente de cada URL; para usar um dia específico, passe
+PASTA/<AAAA-MM-DD>. --replay-saida ARQUIVO grava o resultado em JSONL (uma linha por produto).
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime
+
+# Configuração global (ajustada por execucao.py)
+CONFIG = {
+    'pasta': None,  # None: não grava nada
+}
+
+
+def caminho_gravacao(pasta: str, url: str, dia: str = None) -> str:
+    chave = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(pasta, dia or date.today().isoformat(), f'{chave}.json.gz')
+
+
+def gravar(url: str, html: str, produto: dict) -> None:
+    """Grava a página do produto, se --gravar estiver ligado. Falhas só geram aviso."""
+    if not CONFIG['pasta']:
+        return
+    caminho = caminho_gravacao(CONFIG['pasta'], url)
+    dados = {
+        'url': url,
+        'quando': datetime.now().isoformat(timespec='seconds'),
+        'produto': produto,
+        'html': html,
+    }
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with gzip.open(temporario, 'wt', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        print(f"[⚠] Aviso: não foi possível gravar a página de {url}: {e}")
+
+
+def listar_gravacoes(pasta: str) -> list:
+    """
+    Caminhos das gravações a reextrair, um por URL. Numa pasta com subpastas de data, a mais
+    recente de cada URL vence; numa pasta de um dia só, usa os arquivos dela.
+    """
+    if not os.path.isdir(pasta):
+        return []
+    por_chave = {}
+    dias = sorted(d for d in os.listdir(pasta) if os.path.isdir(os.path.join(pasta, d)))
+    for base in [pasta] + [os.path.join(pasta, d) for d in dias]:
+        for nome in os.listdir(base):
+            if nome.endswith('.json.gz'):
+                por_chave[nome] = os.path.join(base, nome)
+    return sorted(por_chave.values())
+
+
+def ler_gravacao(caminho: str) -> dict:
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def replay(bot, pasta: str, destino: str = None, saida: str = None) -> int:
+    """
+    Roda bot.extrair_produto sobre as páginas gravadas em pasta e mostra o nome de cada pasta,
+    destacando os que mudaram em relação à gravação. Retorna quantas páginas foram reextraídas.
+    """
+    from execucao import pasta_do_produto
+
+    gravacoes = listar_gravacoes(pasta)
+    if not gravacoes:
+        print(f"[✘] Nenhuma página gravada em {pasta}")
+        return 0
+    print(f"[ℹ] Reextraindo {len(gravacoes)} páginas gravadas em {pasta} (sem navegador)")
+
+    start = time.time()
+    mudaram = erros = 0
+    arquivo_saida = open(saida, 'w', encoding='utf-8') if saida else None
+    try:
+        for i, caminho in enumerate(gravacoes, 1):
+            try:
+                dados = ler_gravacao(caminho)
+                produto = bot.extrair_produto(dados['html'], dados['url'])
+            except Exception as e:
+                erros += 1
+                print(f"[✘] Erro ao reextrair {caminho}: {e}")
+                continue
+
+            anterior = dados['produto']['nome_base']
+            if produto['nome_base'] != anterior:
+                mudaram += 1
+                print(f"[{i}] {anterior} -> {produto['nome_base']}")
+            else:
+                print(f"[{i}] {produto['nome_base']}")
+            if len(produto['arquivos']) != len(dados['produto']['arquivos']):
+                print(f"    [⚠] arquivos: {len(dados['produto']['arquivos'])} -> {len(produto['arquivos'])}")
+
+            if arquivo_saida:
+                linha = {
+                    'url': dados['url'],
+                    'gravado_em': dados['quando'],
+                    'nome_anterior': anterior,
+                    'pasta': pasta_do_produto(produto['nome_base'], destino),
+                }
+                linha.update(produto)
+                arquivo_saida.write(json.dumps(linha, ensure_ascii=False) + '\n')
+    finally:
+        if arquivo_saida:
+            arquivo_saida.close()
+
+    total = len(gravacoes)
+    print(f"\n[⏱] {time.time() - start:.2f}s para reextrair {total} páginas")
+    print(f"[ℹ] {mudaram} nomes de pasta mudaram, {erros} erros")
+    if saida:
+        print(f"[ℹ] Resultado gravado em {saida}")
+    return total
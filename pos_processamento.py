@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pós-processamento das imagens baixadas em um pool de processos:
+- Miniatura JPG em <pasta>/miniaturas/
+- Cópia WebP em <pasta>/webp/
+- Redução opcional do original quando passa de um tamanho máximo
+
+O download só agenda o trabalho e segue em frente; o processamento (CPU) roda em paralelo.
+É incremental: imagens cujas saídas já existem e são mais novas que o original são puladas.
+Depende do Pillow (pip install pillow); sem ele a etapa é desativada com um aviso.
+
+Também pode ser usado sozinho sobre uma pasta já baixada:
+python pos_processamento.py D:/DRIVE
+"""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png')
+PASTA_MINIATURAS = 'miniaturas'
+PASTA_WEBP = 'webp'
+
+# Configuração da etapa (ajustada por iniciar)
+CONFIG = {
+    'miniatura': 400,      # maior lado da miniatura, em pixels
+    'webp': True,
+    'qualidade_webp': 80,
+    'max_lado': None,      # reduz o original se o maior lado passar disso; None mantém
+}
+
+_pool = None
+_pendentes = []
+
+
+def caminhos_saida(caminho: str) -> tuple:
+    """Retorna (miniatura, webp) correspondentes a uma imagem."""
+    pasta, nome = os.path.split(caminho)
+    base = os.path.splitext(nome)[0]
+    return (os.path.join(pasta, PASTA_MINIATURAS, base + '.jpg'),
+            os.path.join(pasta, PASTA_WEBP, base + '.webp'))
+
+
+def atualizado(saida: str, origem: str) -> bool:
+    """True se saida existe e não é mais antiga que origem."""
+    return os.path.exists(saida) and os.path.getmtime(saida) >= os.path.getmtime(origem)
+
+
+def processar_imagem(caminho: str, config: dict) -> dict:
+    """Executado nos processos do pool. Retorna o que foi gerado para o resumo."""
+    from PIL import Image
+
+    miniatura, webp = caminhos_saida(caminho)
+    feito = {'caminho': caminho, 'reduzido': False, 'miniatura': False, 'webp': False}
+    precisa_miniatura = not atualizado(miniatura, caminho)
+    precisa_webp = config['webp'] and not atualizado(webp, caminho)
+
+    with Image.open(caminho) as img:
+        img.load()
+        formato = img.format
+
+        # Reduz o original primeiro, para que as saídas fiquem mais novas que ele
+        max_lado = config['max_lado']
+        if max_lado and max(img.size) > max_lado:
+            img.thumbnail((max_lado, max_lado), Image.LANCZOS)
+            temporario = caminho + '.tmp'
+            img.save(temporario, format=formato, quality=90, optimize=True)
+            os.replace(temporario, caminho)
+            feito['reduzido'] = True
+            precisa_miniatura = True
+            precisa_webp = config['webp']
+
+        if not (precisa_miniatura or precisa_webp):
+            return feito
+
+        rgb = img.convert('RGB') if img.mode not in ('RGB', 'L') else img
+
+        if precisa_webp:
+            os.makedirs(os.path.dirname(webp), exist_ok=True)
+            rgb.save(webp, format='WEBP', quality=config['qualidade_webp'], method=4)
+            feito['webp'] = True
+
+        if precisa_miniatura:
+            lado = config['miniatura']
+            mini = rgb.copy()
+            mini.thumbnail((lado, lado), Image.LANCZOS)
+            os.makedirs(os.path.dirname(miniatura), exist_ok=True)
+            mini.save(miniatura, format='JPEG', quality=85, optimize=True)
+            feito['miniatura'] = True
+
+    return feito
+
+
+def iniciar(processos: int = None, **config) -> bool:
+    """Cria o pool de processos. Retorna False se o Pillow não estiver instalado."""
+    global _pool
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("[⚠] Aviso: Pillow não instalado (pip install pillow). Pós-processamento desativado.")
+        return False
+    CONFIG.update({k: v for k, v in config.items() if v is not None})
+    # 'spawn': o pool só sobe processos no primeiro submit, já com as threads de download e do
+    # supervisor rodando, e um fork de processo com várias threads pode travar o filho
+    _pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+    return True
+
+
+def agendar(caminho: str) -> None:
+    """Agenda o processamento de uma imagem sem bloquear quem chamou."""
+    if _pool is None or not caminho.lower().endswith(EXTENSOES_IMAGEM):
+        return
+    miniatura, webp = caminhos_saida(caminho)
+    if not CONFIG['max_lado'] and atualizado(miniatura, caminho) and (
+            not CONFIG['webp'] or atualizado(webp, caminho)):
+        return
+    _pendentes.append(_pool.submit(processar_imagem, caminho, dict(CONFIG)))
+
+
+def finalizar() -> None:
+    """Espera os trabalhos pendentes e mostra o resumo."""
+    global _pool
+    if _pool is None:
+        return
+    print(f"\n[ℹ] Aguardando pós-processamento de {len(_pendentes)} imagens...")
+    reduzidas = miniaturas = webps = erros = 0
+    for futuro in _pendentes:
+        try:
+            feito = futuro.result()
+        except Exception as e:
+            print(f"[✘] Erro no pós-processamento: {e}")
+            erros += 1
+            continue
+        reduzidas += feito['reduzido']
+        miniaturas += feito['miniatura']
+        webps += feito['webp']
+    _pool.shutdown()
+    _pool = None
+    _pendentes.clear()
+    print(f"[✔] Pós-processamento: {miniaturas} miniaturas, {webps} WebP, "
+          f"{reduzidas} originais reduzidos, {erros} erros")
+
+
+def processar_pasta(raiz: str) -> None:
+    """Percorre raiz e agenda todas as imagens ainda não processadas."""
+    for atual, pastas, arquivos in os.walk(raiz):
+        # Não processa as próprias saídas
+        pastas[:] = [p for p in pastas if p not in (PASTA_MINIATURAS, PASTA_WEBP)]
+        for nome in arquivos:
+            agendar(os.path.join(atual, nome))
+
+
+if __name__ == '__main__':
+    raiz = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    if iniciar():
+        processar_pasta(raiz)
+        finalizar()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supervisor do motor Selenium para execuções longas:
+- N trabalhadores, cada um com um Chrome reaproveitado entre produtos
+- Timeouts de carregamento de página e de script no webdriver
+- Vigia (watchdog) por produto: se o navegador travar, a árvore de processos do Chrome é morta
+- O Chrome é reciclado depois de N páginas, acima de um limite de memória (RSS) ou após um travamento
+- Produtos que travaram voltam para a fila (--reenfileirar vezes) antes de irem para falhas.jsonl
+- Com --cache-navegador, cada trabalhador tem o seu cache HTTP em disco (ver navegador.py)
+- Tempo, memória (navegador e processo Python) e acertos de cache de cada página, e um resumo no fim
+
+A memória é lida com psutil, se instalado; sem ele, de /proc (Linux). Sem nenhum dos dois
+(Windows ou macOS sem psutil) a memória não é medida, --limite-rss não vale e executar avisa isso no início.
+"""
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+
+import navegador
+from execucao import falha_produto
+
+# Configuração global do supervisor (ajustada por execucao.py)
+CONFIG = {
+    'trabalhadores': 1,
+    'paginas_por_navegador': 25,   # recicla o Chrome depois de tantas páginas
+    'limite_rss': 1500 * 1024 * 1024,  # recicla o Chrome acima disso (bytes, árvore inteira)
+    'timeout_pagina': 60,          # driver.set_page_load_timeout
+    'timeout_script': 30,          # driver.set_script_timeout
+    'timeout_produto': 180,        # vigia: tempo máximo de navegador por produto
+    'reenfileirar': 1,             # quantas vezes um produto travado volta para a fila
+}
+
+MB = 1024 * 1024
+
+_estatisticas = {'pico_navegador': 0, 'pico_processo': 0, 'reciclagens': 0,
+                 'travamentos': 0, 'reenfileirados': 0}
+_lock = threading.Lock()
+
+
+class Travamento(Exception):
+    """O navegador estourou um timeout ou foi morto pelo vigia."""
+
+
+def filhos_proc(pid: int) -> list:
+    """PIDs descendentes de pid, lendo /proc (quando não há psutil)."""
+    pais = {}
+    for nome in os.listdir('/proc'):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nome}/stat', 'r') as f:
+                # O nome do processo pode ter espaços: o ppid vem depois do último ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        pais.setdefault(ppid, []).append(int(nome))
+    descendentes, pendentes = [], [pid]
+    while pendentes:
+        filhos = pais.get(pendentes.pop(), [])
+        descendentes += filhos
+        pendentes += filhos
+    return descendentes
+
+
+def rss_proc(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def mede_memoria() -> bool:
+    """True se medir_rss tem de onde ler a memória (psutil ou /proc)."""
+    try:
+        import psutil  # noqa: F401
+        return True
+    except ImportError:
+        return os.path.isdir('/proc')
+
+
+def medir_rss(pid: int, arvore: bool = False) -> int:
+    """RSS em bytes do processo (e, com arvore=True, de todos os descendentes). 0 se não der para medir."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil:
+        try:
+            proc = psutil.Process(pid)
+            processos = [proc] + (proc.children(recursive=True) if arvore else [])
+        except psutil.Error:
+            return 0
+        total = 0
+        for p in processos:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not os.path.isdir('/proc'):
+        return 0
+    pids = [pid] + (filhos_proc(pid) if arvore else [])
+    return sum(rss_proc(p) for p in pids)
+
+
+def matar_arvore(pid: int) -> None:
+    """Mata o processo e todos os descendentes (chromedriver, Chrome e renderers)."""
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        import psutil
+        try:
+            proc = psutil.Process(pid)
+            pids = [p.pid for p in proc.children(recursive=True)] + [pid]
+        except psutil.Error:
+            pids = [pid]
+    except ImportError:
+        pids = filhos_proc(pid) + [pid] if os.path.isdir('/proc') else [pid]
+    for p in pids:
+        try:
+            os.kill(p, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def pid_driver(driver):
+    """PID do chromedriver (raiz da árvore do Chrome), ou None."""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+def registrar_pico(chave: str, valor: int) -> None:
+    with _lock:
+        _estatisticas[chave] = max(_estatisticas[chave], valor)
+
+
+def contar(chave: str) -> None:
+    with _lock:
+        _estatisticas[chave] += 1
+
+
+class Trabalhador:
+    """Um Chrome reaproveitado entre produtos, recriado quando cresce demais ou trava."""
+
+    def __init__(self, numero: int, bot):
+        self.numero = numero
+        self.bot = bot
+        self.driver = None
+        self.paginas = 0
+        self.cache_pagina = None
+        self.janela = navegador.montar_perfil(bot.PERFIL_NAVEGADOR)['janela']
+        # Pasta do cache HTTP em disco deste trabalhador; continua a mesma quando o Chrome é reciclado
+        self.cache = None
+
+    def abrir(self):
+        if self.driver is None:
+            if navegador.CONFIG['cache'] and not self.cache:
+                self.cache = navegador.reservar_cache(navegador.CONFIG['cache'])
+            self.driver = navegador.criar_driver(self.bot.PERFIL_NAVEGADOR, cache=self.cache)
+            self.driver.set_page_load_timeout(CONFIG['timeout_pagina'])
+            self.driver.set_script_timeout(CONFIG['timeout_script'])
+            self.paginas = 0
+        else:
+            # O screenshot estica a janela até a altura da página; volta ao tamanho normal
+            self.driver.set_window_size(*self.janela)
+        return self.driver
+
+    def fechar(self, matar: bool = False) -> None:
+        if self.driver is None:
+            return
+        driver, self.driver = self.driver, None
+        pid = pid_driver(driver)
+        if matar and pid:
+            matar_arvore(pid)
+            return
+        try:
+            driver.quit()
+        except Exception:
+            # quit() falhou: garante que nenhum Chrome fique para trás
+            if pid:
+                matar_arvore(pid)
+
+    def encerrar(self) -> None:
+        self.fechar()
+        if self.cache:
+            navegador.liberar_cache(self.cache)
+            self.cache = None
+
+    def reciclar(self, motivo: str, matar: bool = False) -> None:
+        print(f"[♻] Trabalhador {self.numero}: reciclando o Chrome ({motivo})")
+        self.fechar(matar=matar)
+        contar('reciclagens')
+
+    def renderizar(self, url: str, destino: str = None) -> tuple:
+        """
+        bot.renderizar sob o vigia. Se o produto passar de timeout_produto, a árvore do Chrome
+        é morta (o Selenium então falha na hora) e Travamento é levantado.
+        """
+        from selenium.common.exceptions import TimeoutException
+
+        driver = self.abrir()
+        pid = pid_driver(driver)
+        travou = threading.Event()
+
+        def vigiar():
+            travou.set()
+            print(f"[⚠] Trabalhador {self.numero}: {url} passou de {CONFIG['timeout_produto']}s, "
+                  f"matando o Chrome")
+            if pid:
+                matar_arvore(pid)
+
+        vigia = threading.Timer(CONFIG['timeout_produto'], vigiar)
+        vigia.daemon = True
+        vigia.start()
+        try:
+            resultado = self.bot.renderizar(driver, url, destino)
+            self.cache_pagina = navegador.medir_cache_driver(driver)
+            return resultado
+        except TimeoutException as e:
+            raise Travamento(f"timeout do navegador: {e.msg or e}") from e
+        except Exception as e:
+            if travou.is_set():
+                raise Travamento(f"navegador travado por mais de {CONFIG['timeout_produto']}s") from e
+            raise
+        finally:
+            vigia.cancel()
+            self.paginas += 1
+
+    def depois_da_pagina(self, travado: bool) -> int:
+        """Mede a memória do Chrome e decide se ele deve ser reciclado. Retorna o RSS medido."""
+        if travado:
+            self.reciclar('travamento ou erro do navegador', matar=True)
+            return 0
+        pid = pid_driver(self.driver) if self.driver else None
+        rss = medir_rss(pid, arvore=True) if pid else 0
+        registrar_pico('pico_navegador', rss)
+        if self.driver is not None:
+            if rss > CONFIG['limite_rss']:
+                self.reciclar(f"{rss / MB:.0f} MB acima do limite de {CONFIG['limite_rss'] / MB:.0f} MB")
+            elif self.paginas >= CONFIG['paginas_por_navegador']:
+                self.reciclar(f"{self.paginas} páginas")
+        return rss
+
+    def processar(self, url: str, destino: str = None) -> None:
+        """Processa um produto. Levanta Travamento se ele deve voltar para a fila."""
+        from selenium.common.exceptions import WebDriverException
+
+        start = time.time()
+        try:
+            produto, pasta, cookies, headers = self.renderizar(url, destino)
+        except Travamento as e:
+            contar('travamentos')
+            print(f"[⚠] Trabalhador {self.numero}: {e}")
+            self.depois_da_pagina(travado=True)
+            raise
+        except WebDriverException:
+            # Sessão perdida ou Chrome caído: o próximo produto começa com um navegador novo
+            self.depois_da_pagina(travado=True)
+            raise
+        except Exception:
+            self.depois_da_pagina(travado=False)
+            raise
+        rss_navegador = self.depois_da_pagina(travado=False)
+
+        self.bot.baixar_produto(produto, pasta, cookies=cookies, headers=headers)
+
+        rss_processo = medir_rss(os.getpid())
+        registrar_pico('pico_processo', rss_processo)
+        cache = self.cache_pagina
+        do_cache = f", cache {cache['do_cache']}/{cache['recursos']}" if cache and cache['recursos'] else ''
+        print(f"[⏱] {time.time() - start:.2f}s para processar {url} "
+              f"(Chrome {rss_navegador / MB:.0f} MB, Python {rss_processo / MB:.0f} MB{do_cache})")
+
+
+def executar(bot, urls, destino: str = None, concluido=None) -> int:
+    """
+    Processa as URLs (qualquer iterável, lido aos poucos) com CONFIG['trabalhadores'] Chromes.
+    Produtos que travaram voltam para a fila depois da passada principal.
+    concluido(url) é chamado para cada produto processado com sucesso.
+    Retorna quantas URLs foram lidas.
+    """
+    n = max(1, CONFIG['trabalhadores'])
+    if not mede_memoria():
+        print("[⚠] Aviso: sem psutil e sem /proc a memória não é medida e --limite-rss não recicla o Chrome "
+              "(pip install psutil); a reciclagem fica só por --paginas-por-navegador")
+    fila = queue.Queue(maxsize=n * 2)
+    tentativas = {}
+    reenfileirar = []
+    lock_fila = threading.Lock()
+
+    def trabalhar(trabalhador):
+        while True:
+            item = fila.get()
+            try:
+                if item is None:
+                    return
+                i, url = item
+                print(f"\n[{i}] Processando: {url}")
+                try:
+                    trabalhador.processar(url, destino)
+                    if concluido:
+                        concluido(url)
+                except Travamento as e:
+                    with lock_fila:
+                        tentativas[url] = tentativas.get(url, 0) + 1
+                        volta = tentativas[url] <= CONFIG['reenfileirar']
+                        if volta:
+                            reenfileirar.append(item)
+                    if volta:
+                        contar('reenfileirados')
+                        print(f"[↻] {url} volta para o fim da fila")
+                    else:
+                        falha_produto(url, e)
+                except Exception as e:
+                    falha_produto(url, e)
+                    # Continua com a próxima URL
+            finally:
+                fila.task_done()
+
+    trabalhadores = [Trabalhador(k, bot) for k in range(1, n + 1)]
+    threads = [threading.Thread(target=trabalhar, args=(t,), daemon=True, name=f'trabalhador-{t.numero}')
+               for t in trabalhadores]
+    for t in threads:
+        t.start()
+
+    total = 0
+    try:
+        for total, url in enumerate(urls, 1):
+            # Fila limitada: só lê a próxima URL quando algum trabalhador estiver livre
+            fila.put((total, url))
+        fila.join()
+
+        while reenfileirar:
+            with lock_fila:
+                lote, reenfileirar[:] = list(reenfileirar), []
+            print(f"\n[ℹ] Reprocessando {len(lote)} produtos que travaram")
+            for item in lote:
+                fila.put(item)
+            fila.join()
+    finally:
+        for _ in threads:
+            fila.put(None)
+        for t in threads:
+            t.join()
+        for t in trabalhadores:
+            t.encerrar()
+    return total
+
+
+def resumo() -> None:
+    e = _estatisticas
+    print(f"[ℹ] Memória: pico do Chrome {e['pico_navegador'] / MB:.0f} MB, "
+          f"pico do Python {e['pico_processo'] / MB:.0f} MB")
+    print(f"[ℹ] Navegadores: {e['reciclagens']} reciclagens, {e['travamentos']} travamentos, "
+          f"{e['reenfileirados']} produtos reenfileirados")